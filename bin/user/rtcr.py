@@ -130,6 +130,11 @@ weewx.conf as follows:
         # commented out or blank.
         # remote_server_url = http://your.website.com/post_clientraw.php
 
+        # Whether to gzip compress data posted to remote_server_url. Only
+        # enable if the web server or script receiving the post supports gzip
+        # Content-Encoding. Optional, default is False.
+        # post_compression = False
+
         # min_interval sets the minimum clientraw.txt generation interval.
         # 10 seconds is recommended for all Saratoga template users. Default
         # is 0 seconds.
@@ -192,15 +197,19 @@ Alternative Dashboard
 # TODO. seed RtcrBuffer day stats properties with values from daily summaries on startup and perhaps again on the next archive record
 
 # python imports
+import base64
+import bisect
 import datetime
+import gzip
 import math
 import os.path
 import socket
 import threading
 import time
 
+from collections import deque, namedtuple
+from io import BytesIO
 from operator import itemgetter
-from io import open
 
 # Python 2/3 compatibility shims
 import six
@@ -216,7 +225,8 @@ import weewx.tags
 import weewx.units
 import weewx.wxformulas
 from weewx.engine import StdService
-from weewx.units import ValueTuple, convert, ListOfDicts, getStandardUnitType, convertStd
+from weewx.units import ValueTuple, convert, getStandardUnitType, convertStd
+from weewx.units import METER_PER_FOOT
 from weeutil.weeutil import to_bool, to_int
 
 # import/setup logging, WeeWX v3 is syslog based but WeeWX v4 is logging based,
@@ -276,23 +286,31 @@ except ImportError:
 RTCR_VERSION = '0.3.7'
 
 # the obs that we will buffer
-MANIFEST = ['outTemp', 'barometer', 'outHumidity', 'rain', 'rainRate',
-            'humidex', 'windchill', 'heatindex', 'windSpeed', 'inTemp',
-            'appTemp', 'dewpoint', 'windDir', 'wind', 'windrun']
+MANIFEST = frozenset(['outTemp', 'barometer', 'outHumidity', 'rain', 'rainRate',
+                      'humidex', 'windchill', 'heatindex', 'windSpeed', 'inTemp',
+                      'appTemp', 'dewpoint', 'windDir', 'wind', 'windrun'])
 # obs for which we need hi/lo data
-HILO_MANIFEST = ['outTemp', 'barometer', 'outHumidity',
-                 'humidex', 'windchill', 'heatindex', 'windSpeed', 'inTemp',
-                 'appTemp', 'dewpoint']
+HILO_MANIFEST = frozenset(['outTemp', 'barometer', 'outHumidity',
+                           'humidex', 'windchill', 'heatindex', 'windSpeed', 'inTemp',
+                           'appTemp', 'dewpoint'])
 # obs for which we need a history
-HIST_MANIFEST = ['windSpeed', 'windDir']
+HIST_MANIFEST = frozenset(['windSpeed', 'windDir'])
 # obs for which we need a running sum
-SUM_MANIFEST = ['rain', 'windrun']
+SUM_MANIFEST = frozenset(['rain', 'windrun'])
 MAX_AGE = 600
 DEFAULT_MAX_CACHE_AGE = 600
 DEFAULT_AV_SPEED_PERIOD = 300
 DEFAULT_GUST_PERIOD = 300
 DEFAULT_GRACE = 200
 DEFAULT_TREND_PERIOD = 3600
+# clientraw trend logic strings for falling, steady and rising trends
+TREND_SIGNS = ('-1', '0', '+1')
+# types of package sent to our thread via the queue, each package is a two way
+# tuple of (package type, payload)
+TYPE_LOOP, TYPE_ARCHIVE, TYPE_STATS, TYPE_EVENT = range(4)
+# max number of packages allowed in the queue before incoming loop packets are
+# discarded, the queue should only back up this far if our thread is stalled
+MAX_QUEUE_BACKLOG = 100
 
 
 # ============================================================================
@@ -314,6 +332,10 @@ class RealtimeClientraw(StdService):
         # obtain a Queue object so we can communicate with our thread
         self.rtcr_queue = queue.Queue()
 
+        # cache of archive TimeSpan objects used when obtaining historical
+        # stats, keyed by span type
+        self._tspan_cache = {}
+
         # get a db manager object
         manager_dict = weewx.manager.get_manager_dict_from_config(config_dict,
                                                                   'wx_binding')
@@ -332,6 +354,10 @@ class RealtimeClientraw(StdService):
         # the default location to which clientraw.txt is saved
         html_root = os.path.join(config_dict['WEEWX_ROOT'],
                                  config_dict['StdReport'].get('HTML_ROOT', ''))
+        # our thread works with station altitude in metres, convert it once
+        # here and pass the thread a plain float
+        altitude_m = convert(engine.stn_info.altitude_vt, 'meter').value
+        logdbg("station altitude is %s metres" % altitude_m)
         # get an instance of class RealtimeClientrawThread and start the thread
         # running
         self.rtcr_thread = RealtimeClientrawThread(self.rtcr_queue,
@@ -341,22 +367,9 @@ class RealtimeClientraw(StdService):
                                                    location=engine.stn_info.location,
                                                    latitude=engine.stn_info.latitude_f,
                                                    longitude=engine.stn_info.longitude_f,
-                                                   altitude=convert(engine.stn_info.altitude_vt, 'meter').value)
+                                                   altitude=altitude_m)
         self.rtcr_thread.start()
 
-        # forecast and current conditions fields
-        self.forecast_binding = rtcr_config_dict.get('forecast_binding', None)
-        if self.forecast_binding:
-            try:
-                self.forecast_manager = weewx.manager.open_manager_with_config(config_dict,
-                                                                               self.forecast_binding)
-            except weewx.UnknownBinding:
-                self.forecast_manager = None
-            if self.forecast_binding:
-                self.forecast_text_field = rtcr_config_dict.get('forecast_text_field', None)
-                self.forecast_icon_field = rtcr_config_dict.get('forecast_icon_field', None)
-                self.current_text_field = rtcr_config_dict.get('current_text_field', None)
-
         # grace
         self.grace = to_int(rtcr_config_dict.get('grace', DEFAULT_GRACE))
 
@@ -375,26 +388,27 @@ class RealtimeClientraw(StdService):
         self.bind(weewx.END_ARCHIVE_PERIOD, self.end_archive_period)
 
     def new_loop_packet(self, event):
-        """Puts new loop packets in the queue."""
+        """Passes new loop packets to our thread."""
 
-        # package the loop packet in a dict since this is not the only data
-        # we send via the queue
-        _package = {'type': 'loop',
-                    'payload': event.packet}
-        self.rtcr_queue.put(_package)
-        if self.debug_loop:
-            loginf("queued loop packet: %s" % _package['payload'])
+        # queue the loop packet for our thread unless the queue has backed up
+        # beyond the max allowed backlog
+        backlog = self.rtcr_queue.qsize()
+        if backlog < MAX_QUEUE_BACKLOG:
+            self.rtcr_queue.put((TYPE_LOOP, event.packet))
+            if self.debug_loop:
+                loginf("queued loop packet: %s" % event.packet)
+        else:
+            logerr("rtcr queue backlog (%d) reached, loop packet discarded: %s" % (backlog,
+                                                                                   event.packet))
 
     def new_archive_record(self, event):
         """Puts archive records in the rtcr queue."""
 
-        # package the archive record in a dict since this is not the only data
-        # we send via the queue
-        _package = {'type': 'archive',
-                    'payload': event.record}
-        self.rtcr_queue.put(_package)
+        # package the archive record in a tuple since this is not the only
+        # data we send via the queue
+        self.rtcr_queue.put((TYPE_ARCHIVE, event.record))
         if self.debug_archive:
-            loginf("queued archive record: %s" % _package['payload'])
+            loginf("queued archive record: %s" % event.record)
         self.queue_stats(event.record['dateTime'])
 
     def queue_stats(self, ts):
@@ -405,53 +419,43 @@ class RealtimeClientraw(StdService):
         self.db_manager._sync()
         # get yesterday's rainfall and put in the queue
         _rain_data = self.get_historical_rain(ts)
-        # if we have anything to send then package the data in a dict since
+        # if we have anything to send then package the data in a tuple since
         # this is not the only data we send via the queue
         if len(_rain_data) > 0:
-            _package = {'type': 'stats',
-                        'payload': _rain_data}
-            self.rtcr_queue.put(_package)
+            self.rtcr_queue.put((TYPE_STATS, _rain_data))
             if self.debug_stats:
-                loginf("queued historical rainfall data: %s" % _package['payload'])
+                loginf("queued historical rainfall data: %s" % _rain_data)
         # get yesterdays windrun and put in the queue
         _windrun_data = self.get_historical_windrun(ts)
-        # if we have anything to send then package the data in a dict since
+        # if we have anything to send then package the data in a tuple since
         # this is not the only data we send via the queue
         if len(_windrun_data) > 0:
-            _package = {'type': 'stats',
-                        'payload': _windrun_data}
-            self.rtcr_queue.put(_package)
+            self.rtcr_queue.put((TYPE_STATS, _windrun_data))
             if self.debug_stats:
-                loginf("queued historical windrun data: %s" % _package['payload'])
+                loginf("queued historical windrun data: %s" % _windrun_data)
         # get max gust in the last hour and put in the queue
         _hour_gust = self.get_hour_gust(ts)
-        # if we have anything to send then package the data in a dict since
+        # if we have anything to send then package the data in a tuple since
         # this is not the only data we send via the queue
         if len(_hour_gust) > 0:
-            _package = {'type': 'stats',
-                        'payload': _hour_gust}
-            self.rtcr_queue.put(_package)
+            self.rtcr_queue.put((TYPE_STATS, _hour_gust))
             if self.debug_stats:
-                loginf("queued last hour gust: %s" % _package['payload'])
+                loginf("queued last hour gust: %s" % _hour_gust)
         # get outTemp 1 hour ago and put in the queue
         _hour_temp = self.get_hour_ago_temp(ts)
-        # if we have anything to send then package the data in a dict since
+        # if we have anything to send then package the data in a tuple since
         # this is not the only data we send via the queue
         if len(_hour_temp) > 0:
-            _package = {'type': 'stats',
-                        'payload': _hour_temp}
-            self.rtcr_queue.put(_package)
+            self.rtcr_queue.put((TYPE_STATS, _hour_temp))
             if self.debug_stats:
-                loginf("queued outTemp hour ago: %s" % _package['payload'])
+                loginf("queued outTemp hour ago: %s" % _hour_temp)
 
     def end_archive_period(self, event):
         """Puts END_ARCHIVE_PERIOD event in the rtcr queue."""
 
-        # package the event in a dict since this is not the only data we send
-        # via the queue
-        _package = {'type': 'event',
-                    'payload': weewx.END_ARCHIVE_PERIOD}
-        self.rtcr_queue.put(_package)
+        # package the event in a tuple since this is not the only data we
+        # send via the queue
+        self.rtcr_queue.put((TYPE_EVENT, weewx.END_ARCHIVE_PERIOD))
         if self.debug_archive:
             loginf("queued weewx.END_ARCHIVE_PERIOD event")
 
@@ -478,7 +482,7 @@ class RealtimeClientraw(StdService):
                                                         agg_type='sum')
         # Yesterday's rain
         # get a TimeSpan object for yesterday's archive day
-        yest_tspan = weeutil.weeutil.archiveDaysAgoSpan(ts, days_ago=1)
+        yest_tspan = self.get_archive_span(ts, 'yesterday')
         # create an interpolation dict
         inter_dict = {'table_name': self.db_manager.table_name,
                       'start': yest_tspan.start,
@@ -488,12 +492,12 @@ class RealtimeClientraw(StdService):
                "WHERE dateTime > %(start)s AND dateTime <= %(stop)s"
         # execute the query
         _row = self.db_manager.getSql(_sql % inter_dict)
-        if _row and None not in _row:
+        if _row is not None and _row[0] is not None:
             result['yest_rain_vt'] = ValueTuple(_row[0], unit, group)
 
         # This month's rain
         # get a TimeSpan object for this month
-        month_tspan = weeutil.weeutil.archiveMonthSpan(ts)
+        month_tspan = self.get_archive_span(ts, 'month')
         # create an interpolation dict
         inter_dict = {'table_name': self.db_manager.table_name,
                       'start': month_tspan.start,
@@ -503,12 +507,12 @@ class RealtimeClientraw(StdService):
                "WHERE dateTime >= %(start)s AND dateTime < %(stop)s"
         # execute the query
         _row = self.db_manager.getSql(_sql % inter_dict)
-        if _row and None not in _row:
+        if _row is not None and _row[0] is not None:
             result['month_rain_vt'] = ValueTuple(_row[0], unit, group)
 
         # This year's rain
         # get a TimeSpan object for this year
-        year_tspan = weeutil.weeutil.archiveYearSpan(ts)
+        year_tspan = self.get_archive_span(ts, 'year')
         # create an interpolation dict
         inter_dict = {'table_name': self.db_manager.table_name,
                       'start': year_tspan.start,
@@ -518,7 +522,7 @@ class RealtimeClientraw(StdService):
                "WHERE dateTime >= %(start)s AND dateTime < %(stop)s"
         # execute the query
         _row = self.db_manager.getSql(_sql % inter_dict)
-        if _row and None not in _row:
+        if _row is not None and _row[0] is not None:
             result['year_rain_vt'] = ValueTuple(_row[0], unit, group)
 
         return result
@@ -532,7 +536,7 @@ class RealtimeClientraw(StdService):
                                                         agg_type='sum')
         # Yesterday's windrun
         # get a TimeSpan object for yesterday's archive day
-        yest_tspan = weeutil.weeutil.archiveDaysAgoSpan(ts, days_ago=1)
+        yest_tspan = self.get_archive_span(ts, 'yesterday')
         # create an interpolation dict
         inter_dict = {'table_name': self.db_manager.table_name,
                       'start': yest_tspan.start,
@@ -542,12 +546,12 @@ class RealtimeClientraw(StdService):
                "WHERE dateTime > %(start)s AND dateTime <= %(stop)s"
         # execute the query
         _row = self.db_manager.getSql(_sql % inter_dict)
-        if _row and None not in _row:
+        if _row is not None and _row[0] is not None:
             result['yest_windrun_vt'] = ValueTuple(_row[0], unit, group)
 
         # This month's windrun
         # get a TimeSpan object for this month
-        month_tspan = weeutil.weeutil.archiveMonthSpan(ts)
+        month_tspan = self.get_archive_span(ts, 'month')
         # create an interpolation dict
         inter_dict = {'table_name': self.db_manager.table_name,
                       'start': month_tspan.start,
@@ -557,12 +561,12 @@ class RealtimeClientraw(StdService):
                "WHERE dateTime >= %(start)s AND dateTime < %(stop)s"
         # execute the query
         _row = self.db_manager.getSql(_sql % inter_dict)
-        if _row and None not in _row:
+        if _row is not None and _row[0] is not None:
             result['month_windrun_vt'] = ValueTuple(_row[0], unit, group)
 
         # This year's windrun
         # get a TimeSpan object for this year
-        year_tspan = weeutil.weeutil.archiveYearSpan(ts)
+        year_tspan = self.get_archive_span(ts, 'year')
         # create an interpolation dict
         inter_dict = {'table_name': self.db_manager.table_name,
                       'start': year_tspan.start,
@@ -572,11 +576,42 @@ class RealtimeClientraw(StdService):
                "WHERE dateTime >= %(start)s AND dateTime < %(stop)s"
         # execute the query
         _row = self.db_manager.getSql(_sql % inter_dict)
-        if _row and None not in _row:
+        if _row is not None and _row[0] is not None:
             result['year_windrun_vt'] = ValueTuple(_row[0], unit, group)
 
         return result
 
+    def get_archive_span(self, ts, span):
+        """Obtain an archive TimeSpan object, using a cached value if possible.
+
+        The yesterday, month and year archive spans only change when the
+        archive day changes, so cache the most recent TimeSpan object for each
+        span type along with the archive day to which it applies.
+
+        Inputs:
+            ts:   the timestamp for which the span is required
+            span: the span type, one of 'yesterday', 'month' or 'year'
+
+        Returns:
+            A TimeSpan object.
+        """
+
+        # get the archive day to which ts belongs, a timestamp at midnight
+        # belongs to the previous archive day
+        _day = datetime.date.fromtimestamp(ts - 1)
+        _cached = self._tspan_cache.get(span)
+        if _cached is not None and _cached[0] == _day:
+            return _cached[1]
+        # we have no valid cached span so calculate it
+        if span == 'yesterday':
+            _tspan = weeutil.weeutil.archiveDaysAgoSpan(ts, days_ago=1)
+        elif span == 'month':
+            _tspan = weeutil.weeutil.archiveMonthSpan(ts)
+        else:
+            _tspan = weeutil.weeutil.archiveYearSpan(ts)
+        self._tspan_cache[span] = (_day, _tspan)
+        return _tspan
+
     def get_hour_gust(self, ts):
         """Obtain the max wind gust in the last hour."""
 
@@ -594,7 +629,7 @@ class RealtimeClientraw(StdService):
                "WHERE dateTime > %(start)s AND dateTime <= %(stop)s"
         # execute the query
         _row = self.db_manager.getSql(_sql % inter_dict)
-        if _row and None not in _row:
+        if _row is not None and _row[0] is not None:
             result['hour_gust_vt'] = ValueTuple(_row[0], unit, group)
         # now get the time it occurred
         _sql = "SELECT dateTime FROM %(table_name)s "\
@@ -603,7 +638,7 @@ class RealtimeClientraw(StdService):
                "WHERE dateTime > %(start)s and dateTime <= %(stop)s) AND windGust IS NOT NULL"
         # execute the query
         _row = self.db_manager.getSql(_sql % inter_dict)
-        if _row and None not in _row:
+        if _row is not None and _row[0] is not None:
             result['hour_gust_ts'] = _row[0]
         return result
 
@@ -811,6 +846,63 @@ class RealtimeClientrawThread(threading.Thread):
         176: 0,  # - 10-minute average wind direction
         177: None,  # - record end
     }
+    # the number of clientraw.txt fields we populate
+    field_count = len(field_formats)
+    # stats that are always used in a fixed unit and the unit concerned,
+    # these stats are converted when received rather than each time they are
+    # used
+    stats_units = {'yest_rain_vt': 'mm',
+                   'month_rain_vt': 'mm',
+                   'year_rain_vt': 'mm',
+                   'hour_gust_vt': 'knot',
+                   'hour_ago_outTemp_vt': 'degree_C'}
+    # clientraw.txt fields that have a fixed value, (field number, value)
+    const_fields = ((0, '12345'),  # start of fields marker
+                    (15, 0),  # Forecast Icon - not yet implemented
+                    (16, 0.0),  # WMR968 extra temperature (Celsius) - will not implement
+                    (17, 0.0),  # WMR968 extra humidity (Celsius) - will not implement
+                    (18, 0.0),  # WMR968 extra sensor (Celsius) - will not implement
+                    (33, 0),  # dallas lightning count - will not implement
+                    (37, 0.0),  # WMR968/200 battery 1 - will not implement
+                    (38, 0.0),  # WMR968/200 battery 2 - will not implement
+                    (39, 100),  # WMR968/200 battery 3 - will not implement
+                    (40, 100),  # WMR968/200 battery 4 - will not implement
+                    (41, 100),  # WMR968/200 battery 5 - will not implement
+                    (42, 100),  # WMR968/200 battery 6 - will not implement
+                    (43, 100),  # WMR968/200 battery 7 - will not implement
+                    (48, 0),  # icon type - not yet implemented
+                    (49, '---'),  # weather description - not yet implemented
+                    (114, 0),  # lightning count in last minute - will not implement
+                    (115, '---'),  # time of last lightning strike - will not implement
+                    (116, '---'),  # date of last lightning strike - will not implement
+                    (118, 0.0),  # nexstorm distance - will not implement
+                    (119, 0.0),  # nexstorm bearing - will not implement
+                    (142, 0.0),  # THSWS - will not implement
+                    (167, 0.0),  # Current Cost Channel 1 - will not implement
+                    (168, 0.0),  # Current Cost Channel 2 - will not implement
+                    (169, 0.0),  # Current Cost Channel 3 - will not implement
+                    (170, 0.0),  # Current Cost Channel 4 - will not implement
+                    (171, 0.0),  # Current Cost Channel 5 - will not implement
+                    (172, 0.0),  # Current Cost Channel 6 - will not implement
+                    (177, '!!WS%s!!' % RTCR_VERSION))  # record end (WD Version)
+    # the hourly history fields 051-070 (windspeed), 080-089 (wind speed),
+    # 091-099 (temperature), 100-109 (rain) and 146-155 (wind direction) will
+    # not be implemented, they are always 0.0
+    history_fields = tuple(range(51, 71)) + tuple(range(80, 90)) + \
+        tuple(range(91, 110)) + tuple(range(146, 156))
+    # clientraw.txt fields that are taken directly from a METRICWX packet,
+    # (field number, packet field, value to use if the packet field is missing
+    # or None)
+    packet_fields = ((4, 'outTemp', 0.0),  # outTemp (Celsius)
+                     (5, 'outHumidity', 0.0),  # outHumidity
+                     (6, 'barometer', 0.0),  # barometer(hPa)
+                     (12, 'inTemp', 0.0),  # inTemp (Celsius)
+                     (13, 'inHumidity', 0.0),  # inHumidity
+                     (44, 'windchill', 0.0),  # windchill (Celsius)
+                     (72, 'dewpoint', 0.0),  # dewpoint (Celsius)
+                     (79, 'UV', 0),  # Davis VP UV
+                     (112, 'heatindex', 0.0),  # heatindex (Celsius)
+                     (127, 'radiation', 0.0))  # VP solar
     # default direction if no other non-None value can be found
     DEFAULT_DIR = 0
     # inter-cardinal to degrees lookup:
@@ -855,6 +947,23 @@ class RealtimeClientrawThread(threading.Thread):
         self.remote_server_url = rtcr_config_dict.get('remote_server_url', None)
         # timeout to be used for remote URL posts
         self.timeout = to_int(rtcr_config_dict.get('timeout', 2))
+        # whether to gzip compress remote URL posts
+        self.post_compression = to_bool(rtcr_config_dict.get('post_compression',
+                                                              False))
+        # The HTTP connection used for remote URL posts. The connection is
+        # created on first use and is then kept open and reused for
+        # subsequent posts to avoid setting up a new TCP (and possibly TLS)
+        # connection for every post.
+        self.post_connection = None
+        self.post_path = None
+        # any headers that must be included in each post, eg proxy credentials
+        self.post_headers = {}
+        # Remote URL posts are made by a separate thread so that file
+        # generation is not held up by a slow remote server. Only the latest
+        # clientraw data is of interest so the post queue holds at most one
+        # item. The queue and thread are created when our thread runs.
+        self.post_queue = None
+        self.post_thread = None
 
         # some field definition settings (mainly time periods for averages etc)
         self.avgspeed_period = to_int(rtcr_config_dict.get('avgspeed_period',
@@ -867,6 +976,10 @@ class RealtimeClientrawThread(threading.Thread):
         self.long_time_fmt = rtcr_config_dict.get('long_time_format', '%H:%M:%S')
         self.short_time_fmt = rtcr_config_dict.get('short_time_format', '%H:%M')
         self.flag_format = '%.0f'
+        # and the functions used to format a struct_time using these formats
+        self.date_formatter = time_formatter(self.date_fmt)
+        self.long_time_formatter = time_formatter(self.long_time_fmt)
+        self.short_time_formatter = time_formatter(self.short_time_fmt)
 
         # get max cache age, used for caching loop data from partial packet
         # stations
@@ -939,6 +1052,29 @@ class RealtimeClientrawThread(threading.Thread):
         self.soil_temp = extra_sensor_config_dict.get('soilTempSensor', 'soilTemp1')
         # leaf wetness
         self.leaf_wet = extra_sensor_config_dict.get('leafWetSensor', 'leafWet1')
+        # The clientraw.txt fields that are populated directly from a mapped
+        # packet field do not change once we are initialised, so construct a
+        # list of (field number, extract function) tuples once rather than
+        # working through each mapping every packet.
+        self.field_fns = [(14, packet_field(self.soil_temp, 100.0)),
+                          (20, packet_field(self.extra_temp1, -100.0)),
+                          (21, packet_field(self.extra_temp2, -100.0)),
+                          (22, packet_field(self.extra_temp3, -100.0)),
+                          (23, packet_field(self.extra_temp4, -100.0)),
+                          (24, packet_field(self.extra_temp5, -100.0)),
+                          (25, packet_field(self.extra_temp6, -100.0)),
+                          (26, packet_field(self.extra_hum1, -100)),
+                          (27, packet_field(self.extra_hum2, -100)),
+                          (28, packet_field(self.extra_hum3, -100)),
+                          (120, packet_field(self.extra_temp7, -100)),
+                          (121, packet_field(self.extra_temp8, -100)),
+                          (122, packet_field(self.extra_hum4, -100)),
+                          (123, packet_field(self.extra_hum5, -100)),
+                          (124, packet_field(self.extra_hum6, -100)),
+                          (125, packet_field(self.extra_hum7, -100)),
+                          (126, packet_field(self.extra_hum8, -100)),
+                          (156, packet_field(self.leaf_wet, 0.0)),
+                          (157, packet_field(self.soil_moist, 255.0))]
         # set trend periods
         self.baro_trend_period = to_int(rtcr_config_dict.get('baro_trend_period',
                                                              DEFAULT_TREND_PERIOD))
@@ -948,6 +1084,12 @@ class RealtimeClientrawThread(threading.Thread):
                                                                  DEFAULT_TREND_PERIOD))
         self.humidex_trend_period = to_int(rtcr_config_dict.get('humidex_trend_period',
                                                                 DEFAULT_TREND_PERIOD))
+        # Our trend calculations use recent archive records, keep enough
+        # archive records in memory to cover the longest trend period.
+        self.archive_cache = ArchiveCache(max(self.baro_trend_period,
+                                              self.temp_trend_period,
+                                              self.humidity_trend_period,
+                                              self.humidex_trend_period) + self.grace)
 
         # flag to indicate a change of day has occurred
         self.new_day = False
@@ -958,9 +1100,61 @@ class RealtimeClientrawThread(threading.Thread):
         self.max_barometer = None
         # get some station info
         self.location = location
+        # the station name as used in clientraw.txt field 032, to maintain
+        # fidelity of station names that include dashes and spaces any dashes
+        # are replaced with en dashes and any spaces are replaced with
+        # underscores
+        self.cr_location = location.replace('-', '&ndash;').replace(' ', '_')
+        # cache of unit conversion functions used when converting buffer data,
+        # keyed by (buffer unit system, obs type, unit converted to)
+        self.converters = dict()
         self.latitude = latitude
         self.longitude = longitude
         self.altitude_m = altitude
+        # The list used to hold the calculated clientraw.txt data, the list is
+        # indexed by clientraw.txt field number and is reused for each
+        # generation. Populate the fixed value fields now, they never change.
+        self.data_buf = [0.0] * self.field_count
+        for i, value in self.const_fields:
+            self.data_buf[i] = value
+        # the station position fields are also fixed, 160 - latitude (-ve for
+        # south) and 161 - longitude (-ve for east)
+        self.data_buf[160] = self.latitude
+        self.data_buf[161] = -self.longitude
+        # The format string used to format each clientraw.txt field, in field
+        # order. None is used for fields that are not formatted.
+        self.field_fmts = list()
+        for field_num in range(self.field_count):
+            places = self.field_formats[field_num]
+            self.field_fmts.append("%%.%df" % places if places is not None else None)
+        # A format string that formats a complete clientraw.txt record in one
+        # operation. Fields with a fixed value are rendered into the format
+        # string now, the remaining fields are extracted from the data list
+        # using an itemgetter. Fields that are not formatted are rendered
+        # using '%s'.
+        fixed_fields = set([i for i, value in self.const_fields])
+        fixed_fields.update(self.history_fields)
+        fixed_fields.update((160, 161))
+        record_fmts = list()
+        var_fields = list()
+        for field_num, fmt in enumerate(self.field_fmts):
+            if field_num in fixed_fields:
+                fixed_value = render_field(self.data_buf[field_num], fmt)
+                record_fmts.append(fixed_value.replace('%', '%%'))
+            else:
+                record_fmts.append(fmt if fmt is not None else '%s')
+                var_fields.append(field_num)
+        self.record_fmt = ' '.join(record_fmts)
+        self.var_fields = itemgetter(*var_fields)
+        # cloudbase and appTemp caches, (inputs, calculated value)
+        self.cloudbase_cache = (None, None)
+        self.app_temp_cache = (None, None)
+
+        # forecast and current conditions fields, the forecast fields are not
+        # yet implemented so there is no forecast db manager
+        self.forecast_text_field = rtcr_config_dict.get('forecast_text_field', None)
+        self.forecast_icon_field = rtcr_config_dict.get('forecast_icon_field', None)
+        self.current_text_field = rtcr_config_dict.get('current_text_field', None)
 
         # initialise some properties to be used later
         self.db_manager = None
@@ -988,6 +1182,8 @@ class RealtimeClientrawThread(threading.Thread):
             else:
                 _msg = "HTTP POST timeout is %d seconds" % self.timeout
             logdbg(_msg)
+            if self.post_compression:
+                logdbg("HTTP POST data will be gzip compressed")
         if self.disable_local_save and self.remote_server_url is None:
             loginf("Warning: clientraw.txt will not be saved locally "
                    "nor will it be posted via HTTP POST")
@@ -1039,6 +1235,13 @@ class RealtimeClientrawThread(threading.Thread):
             # running before getting db managers
             # get a db manager
             self.db_manager = weewx.manager.open_manager(self.manager_dict)
+            # if we are posting to a remote URL start our post thread
+            if self.remote_server_url is not None:
+                self.post_queue = queue.Queue(maxsize=1)
+                self.post_thread = threading.Thread(target=self.post_loop,
+                                                    name='RtcrPostThread')
+                self.post_thread.daemon = True
+                self.post_thread.start()
             # initialise our day stats
             self.day_stats = self.db_manager._get_day_summary(time.time())
             # create a RtcrBuffer object to hold our loop 'stats'
@@ -1048,6 +1251,9 @@ class RealtimeClientrawThread(threading.Thread):
             _ts = self.db_manager.lastGoodStamp()
             if _ts is not None:
                 _rec = self.db_manager.getRecord(_ts)
+                # prime our archive record cache with the archive records
+                # leading up to the last good record
+                self.archive_cache.load(self.db_manager, _ts)
             else:
                 _rec = {'usUnits': None}
             # convert it to our buffer unit system
@@ -1064,90 +1270,157 @@ class RealtimeClientrawThread(threading.Thread):
             # now run a continuous loop, waiting for records to appear in the rtcr
             # queue then processing them.
             while True:
+                # wait until there is something in the rtcr queue
+                _package = self.rtcr_queue.get()
+                # Process everything in the rtcr queue without blocking and in
+                # the order received. Every loop packet must update our state,
+                # but if a loop packet is immediately followed by another loop
+                # packet there is no need to generate clientraw.txt from it.
+                # So hold on to each loop packet until we see what follows it.
+                _loop_packet = None
                 while True:
-                    _package = self.rtcr_queue.get()
                     # a None record is our signal to exit
                     if _package is None:
+                        self.stop_post_thread()
                         return
-                    elif _package['type'] == 'archive':
-                        self.new_archive_record(_package['payload'])
+                    _type, _payload = _package
+                    if _type == TYPE_LOOP:
+                        if self.debug_loop or self.debug_queue:
+                            loginf("received packet: %s" % _payload)
+                        if _loop_packet is not None:
+                            # a later loop packet is waiting, just update our
+                            # state with the earlier packet
+                            self.update_state(_loop_packet)
+                        _loop_packet = _payload
+                    elif _loop_packet is not None:
+                        # the loop packet we are holding must be processed
+                        # before this package
+                        self.process_packet(_loop_packet)
+                        _loop_packet = None
+                    if _type == TYPE_ARCHIVE:
+                        self.new_archive_record(_payload)
                         if self.debug_archive or self.debug_queue:
                             loginf("received archive record")
-                        continue
-                    elif _package['type'] == 'event':
-                        if _package['payload'] == weewx.END_ARCHIVE_PERIOD:
+                    elif _type == TYPE_EVENT:
+                        if _payload == weewx.END_ARCHIVE_PERIOD:
                             if self.debug_archive or self.debug_queue:
                                 loginf("received event - END_ARCHIVE_PERIOD")
                             self.end_archive_period()
-                        continue
-                    elif _package['type'] == 'stats':
+                    elif _type == TYPE_STATS:
                         if self.debug_stats or self.debug_queue:
-                            loginf("received stats package payload=%s" % (_package['payload'], ))
-                        self.process_stats(_package['payload'])
+                            loginf("received stats package payload=%s" % (_payload, ))
+                        self.process_stats(_payload)
                         if self.debug_stats or self.debug_queue:
                             loginf("processed stats package")
-                        continue
-                    # if packets have backed up in the rtcr queue, trim it until
-                    # it's no bigger than the max allowed backlog
-                    if self.rtcr_queue.qsize() <= 5:
+                    try:
+                        _package = self.rtcr_queue.get_nowait()
+                    except queue.Empty:
                         break
-
-                # if we made it here we have a loop packet to process
-                if self.debug_loop or self.debug_queue:
-                    loginf("received packet: %s" % _package['payload'])
-                self.process_packet(_package['payload'])
+                # the queue is empty, process any loop packet we are holding
+                if _loop_packet is not None:
+                    self.process_packet(_loop_packet)
         except Exception as e:
             # Some unknown exception occurred. This is probably a serious
             # problem. Exit.
             logcrit("Unexpected exception of type %s" % (type(e), ))
             log_traceback_error('**** ')
             logcrit("Thread exiting. Reason: %s" % (e, ))
+            self.stop_post_thread()
             return
 
+    def post_loop(self):
+        """Post clientraw data from the post queue to the remote URL.
+
+        Runs in our post thread. Waits for clientraw data to appear in the
+        post queue and posts it. A None in the post queue is the signal to
+        exit.
+        """
+
+        try:
+            while True:
+                data = self.post_queue.get()
+                # a None is our signal to exit
+                if data is None:
+                    break
+                # wrap in a try..except so an unexpected error does not kill
+                # the post thread
+                try:
+                    self.post_data(data)
+                except Exception:
+                    log_traceback_error('rtcrpost: **** ')
+        finally:
+            self.close_post_connection()
+
+    def queue_post(self, data):
+        """Place clientraw data in the post queue.
+
+        Only the latest clientraw data is of interest, so if the post thread
+        has not yet picked up the previous clientraw data it is discarded.
+
+        Inputs:
+            data: utf-8 encoded clientraw data, None is used to stop the post
+                  thread
+        """
+
+        while True:
+            try:
+                self.post_queue.put_nowait(data)
+                return
+            except queue.Full:
+                # discard the waiting data and try again
+                try:
+                    self.post_queue.get_nowait()
+                except queue.Empty:
+                    pass
+                if self.debug_post:
+                    loginf("unposted clientraw data discarded")
+
+    def stop_post_thread(self):
+        """Stop our post thread if it is running."""
+
+        if self.post_thread is not None and self.post_thread.is_alive():
+            self.queue_post(None)
+            # the post thread may be part way through a post so wait a little
+            # longer than the post timeout for it to exit
+            self.post_thread.join(self.timeout + 5)
+            if self.post_thread.is_alive():
+                logerr("Unable to shut down %s thread" % self.post_thread.name)
+
     def process_packet(self, packet):
-        """Process incoming loop packets and generate clientraw.txt."""
+        """Process incoming loop packets and generate clientraw.txt.
 
-        # get time for debug timing
-        t1 = time.time()
+        Processing a loop packet is done in two parts:
 
-        # If the buffer unit system is None adopt the unit system of the
-        # incoming loop packet, this should only ever happen if we were started
-        # with an empty database
-        if self.buffer.unit_system is not None:
-            # make sure the packet is in our buffer unit system
-            conv_packet = weewx.units.to_std_system(packet,
-                                                    self.buffer.unit_system)
-        else:
-            # have the buffer adopt the unit system of the packet
-            self.buffer.unit_system = packet['usUnits']
-            # there is no need ot convert the packet
-            conv_packet = packet
+        1. Updating our state. Every loop packet must be converted to our
+           buffer unit system, used to update the packet cache and added to
+           the buffer, otherwise our day stats, averages and sums will be
+           wrong. This is done by update_state(), which is also used on its
+           own for any loop packet that is immediately followed by another
+           loop packet in the rtcr queue, and is kept as light as possible.
 
-        # update the packet cache with this packet
-        self.packet_cache.update(conv_packet, conv_packet['dateTime'])
+        2. Generating clientraw.txt. Everything else, calculating the
+           clientraw.txt fields, formatting the fields, writing the file and
+           posting the data, is only needed when clientraw.txt is to be
+           generated, so it is only done once min_interval has elapsed since
+           the last generation.
 
-        # is this the first packet of the day, if so we need to reset our
-        # buffer day stats
-        dow = time.strftime('%w', time.localtime(conv_packet['dateTime']))
-        if self.dow is not None and self.dow != dow:
-            self.new_day = True
-            self.buffer.start_of_day_reset()
-        self.dow = dow
+        Inputs:
+            packet: the loop packet to be processed
+        """
 
-        # if this is the first packet after 9am we need to reset any 9am sums
-        # first get the current hour as an int
-        _hour = int(time.strftime('%H', time.localtime(conv_packet['dateTime'])))
-        # if it's a new day and hour >= 9 we need to reset any 9am sums
-        if self.new_day and _hour >= 9:
-            self.new_day = False
-            self.buffer.nineam_reset()
+        # get time for debug timing
+        t1 = time.time()
 
-        # now add the packet to our buffer
-        self.buffer.add_packet(conv_packet)
+        # update our state with the packet
+        conv_packet = self.update_state(packet)
+
+        # our state is now up to date, anything that follows is only required
+        # if we are generating clientraw.txt
 
         # generate if we have no minimum interval setting or if minimum
-        # interval seconds have elapsed since our last generation
-        if self.min_interval is None or (self.last_write + float(self.min_interval)) < time.time():
+        # interval seconds have elapsed since our last generation, use the time
+        # we started processing this packet rather than fetching the time again
+        if self.min_interval is None or (self.last_write + self.min_interval) < t1:
             try:
                 # get a cached packet
                 cached_packet = self.packet_cache.get_packet(conv_packet['dateTime'],
@@ -1156,18 +1429,19 @@ class RealtimeClientrawThread(threading.Thread):
                     loginf("cached loop packet: %s" % (cached_packet,))
                 # get a data dict from which to construct our file
                 data = self.calculate(cached_packet)
-                # convert our data dict to a clientraw string
-                cr_string = self.create_clientraw_string(data)
+                # convert our data dict to a clientraw string, both the file
+                # and any remote post use utf-8 encoded bytes so encode once
+                cr_bytes = self.create_clientraw_string(data).encode('utf-8')
                 if not self.disable_local_save:
                     # write our file
-                    self.write_data(cr_string)
+                    self.write_data(cr_bytes)
                 # set our write time, this is only used to determine our next
                 # generation time
                 self.last_write = time.time()
                 # if required send the data to a remote URL via HTTP POST
                 if self.remote_server_url is not None:
-                    # post the data
-                    self.post_data(cr_string)
+                    # hand the data to our post thread
+                    self.queue_post(cr_bytes)
                 # log the generation
                 if self.debug_gen:
                     loginf("packet (%s) clientraw.txt generated in %.5f seconds" % (cached_packet['dateTime'],
@@ -1179,6 +1453,64 @@ class RealtimeClientrawThread(threading.Thread):
             if self.debug_gen:
                 loginf("packet (%s) skipped" % conv_packet['dateTime'])
 
+    def update_state(self, packet):
+        """Update our state with a loop packet.
+
+        Converts the loop packet to our buffer unit system, updates the packet
+        cache and adds the packet to the buffer. Must be called for every loop
+        packet whether or not clientraw.txt is generated.
+
+        Inputs:
+            packet: the loop packet
+
+        Returns:
+            The loop packet in our buffer unit system.
+        """
+
+        # If the buffer unit system is None adopt the unit system of the
+        # incoming loop packet, this should only ever happen if we were started
+        # with an empty database
+        if self.buffer.unit_system is not None:
+            # make sure the packet is in our buffer unit system, usually it
+            # already is
+            if packet['usUnits'] == self.buffer.unit_system:
+                conv_packet = packet
+            else:
+                conv_packet = weewx.units.to_std_system(packet,
+                                                        self.buffer.unit_system)
+        else:
+            # have the buffer adopt the unit system of the packet
+            self.buffer.unit_system = packet['usUnits']
+            # there is no need ot convert the packet
+            conv_packet = packet
+
+        # update the packet cache with this packet
+        self.packet_cache.update(conv_packet, conv_packet['dateTime'])
+
+        # get the local time of the packet as a struct_time once, we use it to
+        # detect the start of a new day and 9am
+        lt = time.localtime(conv_packet['dateTime'])
+
+        # is this the first packet of the day, if so we need to reset our
+        # buffer day stats
+        dow = lt.tm_wday
+        if self.dow is not None and self.dow != dow:
+            self.new_day = True
+            self.buffer.start_of_day_reset()
+        self.dow = dow
+
+        # if this is the first packet after 9am we need to reset any 9am sums
+        # first get the current hour as an int
+        _hour = lt.tm_hour
+        # if it's a new day and hour >= 9 we need to reset any 9am sums
+        if self.new_day and _hour >= 9:
+            self.new_day = False
+            self.buffer.nineam_reset()
+
+        # now add the packet to our buffer
+        self.buffer.add_packet(conv_packet)
+        return conv_packet
+
     def process_stats(self, package):
         """Process a stats package.
 
@@ -1188,15 +1520,90 @@ class RealtimeClientrawThread(threading.Thread):
 
         if package is not None:
             for key, value in iteritems(package):
+                # stats that are always used in the same unit are converted
+                # now rather than each time they are used
+                if key in self.stats_units and value is not None:
+                    try:
+                        value = convert(value, self.stats_units[key])
+                    except KeyError:
+                        value = ValueTuple(None, self.stats_units[key], value.group)
                 setattr(self, key, value)
 
+    def get_converter(self, obs_type, to_unit):
+        """Obtain a function to convert buffer data to a given unit.
+
+        Conversion functions are cached so that the unit lookup only occurs
+        the first time a given conversion is required.
+
+        Inputs:
+            obs_type: the buffer obs type to be converted
+            to_unit:  the unit to be converted to
+
+        Returns:
+            A function that accepts a value in the buffer unit system and
+            returns the value in to_unit. None is returned if there is no known
+            conversion.
+        """
+
+        key = (self.buffer.unit_system, obs_type, to_unit)
+        try:
+            return self.converters[key]
+        except KeyError:
+            from_unit = getStandardUnitType(self.buffer.unit_system, obs_type)[0]
+            converter = make_converter(from_unit, to_unit)
+            self.converters[key] = converter
+            return converter
+
+    def day_hilo(self, obs_buf, obs_type, to_unit):
+        """Obtain the day high and low of a buffered obs in a given unit.
+
+        Inputs:
+            obs_buf:  the buffer object for the obs, may be None
+            obs_type: the buffer obs type
+            to_unit:  the unit to be used for the high and low
+
+        Returns:
+            A two way tuple of the day high and day low in to_unit. Values that
+            are unknown or cannot be converted are returned as 0.0.
+        """
+
+        if obs_buf is None:
+            return 0.0, 0.0
+        converter = self.get_converter(obs_type, to_unit)
+        if converter is None:
+            return 0.0, 0.0
+        high = converter(obs_buf.day_max)
+        low = converter(obs_buf.day_min)
+        return (high if high is not None else 0.0,
+                low if low is not None else 0.0)
+
     def new_archive_record(self, record):
         """Control processing when a new archive record is presented.
 
         When a new archive record is available our interest is in the updated
-        daily summaries.
+        daily summaries. If the record belongs to the day covered by our day
+        stats we add the record to our day stats rather than re-reading the
+        day stats from the database, otherwise we obtain the day stats for the
+        new day from the database. The record is also added to our archive
+        record cache for use in trend calculations.
         """
 
+        self.archive_cache.add(record)
+        if self.day_stats is not None and \
+                self.day_stats.timespan.includesArchiveTime(record['dateTime']):
+            # the record belongs to our day stats, make sure it is in the same
+            # unit system as our day stats
+            if self.day_stats.unit_system is not None and \
+                    record['usUnits'] != self.day_stats.unit_system:
+                record = weewx.units.to_std_system(record,
+                                                   self.day_stats.unit_system)
+            try:
+                self.day_stats.addRecord(record)
+                return
+            except ValueError:
+                # we could not add the record, perhaps a unit system mismatch,
+                # refresh our day stats from the database instead
+                pass
         # refresh our day (archive record based) stats
         self.day_stats = self.db_manager._get_day_summary(record['dateTime'])
 
@@ -1217,75 +1624,184 @@ class RealtimeClientrawThread(threading.Thread):
         The data to be posted is sent as a utf-8 text string.
 
         Inputs:
-            data: clientraw data string
+            data: utf-8 encoded clientraw data
         """
 
-        # get a Request object
-        req = urllib.request.Request(self.remote_server_url)
-        # set our content type to plain text
-        req.add_header('Content-Type', 'text/plain')
         # POST the data but wrap in a try..except, so we can trap any errors
         try:
-            response = self.post_request(req, data)
-            if 200 <= response.code <= 299:
+            response = self.post_request(data)
+            if 200 <= response.status <= 299:
                 # no exception thrown and we received a good response code, log
                 # it and return.
                 if self.log_success or self.debug_post:
-                    loginf("Data successfully posted. Received response: '%s %s'" % (response.getcode(),
-                                                                                     response.msg))
+                    loginf("Data successfully posted. Received response: '%s %s'" % (response.status,
+                                                                                     response.reason))
                 return
             # we received a bad response code, log it and continue
             if self.log_failure or self.debug_post:
-                loginf("Failed to post data. Received response: '%s %s'" % (response.getcode(),
-                                                                            response.msg))
-        except (urllib.error.URLError, socket.error,
-                http_client.BadStatusLine, http_client.IncompleteRead) as e:
+                loginf("Failed to post data. Received response: '%s %s'" % (response.status,
+                                                                            response.reason))
+        except (http_client.HTTPException, socket.error) as e:
             # an exception was thrown, log it and continue
             if self.log_failure or self.debug_post:
                 loginf("Failed to post data. Exception error message: '%s'" % e)
 
-    def post_request(self, request, payload):
-        """Post a Request object.
+    def post_request(self, payload):
+        """Post data to the remote URL using our persistent connection.
+
+        If the post fails on a connection that has been used before it is
+        likely the remote server has closed the idle connection, in that case
+        the post is tried once more on a new connection.
 
         Inputs:
-            request: Request object
-            payload: the data to sent as a unicode string
+            payload: the data to sent as utf-8 encoded bytes
 
         Returns:
-            The urlopen() response
+            The HTTP response
         """
 
-        # The POST data needs to be urlencoded, under python2 urlencoding
-        # unicode characters that have no ascii equivalent raises a
-        # UnicodeEncodeError, the solution is to encode the characters before
-        # urlencoding. Under python3 POST data should be bytes or an iterable
-        # of bytes and not of type str so python3 requires the encoding occur
-        # after the data is urlencoded. So assume we are working under python3
-        # and be prepared to catch the errors.
-        try:
-            enc_payload = urllib.parse.urlencode({"clientraw": payload}).encode('utf-8')
-            _response = urllib.request.urlopen(request,
-                                               data=enc_payload,
-                                               timeout=self.timeout)
-        except UnicodeEncodeError:
-            enc_payload = urllib.parse.urlencode({"clientraw": payload.encode('utf-8')})
-            _response = urllib.request.urlopen(request,
-                                               data=enc_payload,
-                                               timeout=self.timeout)
-        return _response
+        # The POST data needs to be urlencoded. Our payload is already utf-8
+        # encoded so urlencoding produces ascii only text, under python3 this
+        # is a str that must be converted to bytes.
+        enc_payload = six.ensure_binary(urllib.parse.urlencode({"clientraw": payload}))
+        # set our content type to plain text
+        headers = {'Content-Type': 'text/plain'}
+        # if required gzip compress the POST data, clientraw data is mostly
+        # numeric text and compresses well so use the fastest compression
+        if self.post_compression:
+            buf = BytesIO()
+            with gzip.GzipFile(fileobj=buf, mode='wb', compresslevel=1) as gz:
+                gz.write(enc_payload)
+            enc_payload = buf.getvalue()
+            headers['Content-Encoding'] = 'gzip'
+        # was our connection already open
+        reused = self.post_connection is not None
+        while True:
+            connection = self.get_post_connection()
+            # add any headers required by our connection, eg proxy credentials
+            headers.update(self.post_headers)
+            try:
+                connection.request('POST', self.post_path,
+                                   body=enc_payload, headers=headers)
+                response = connection.getresponse()
+                # read the response body, we don't use it but the response
+                # must be read before the connection can be used again
+                response.read()
+                return response
+            except (http_client.HTTPException, socket.error):
+                # the connection is no longer of any use
+                self.close_post_connection()
+                if not reused:
+                    raise
+                # try again on a new connection
+                reused = False
+
+    def get_post_connection(self):
+        """Obtain the HTTP connection used for remote URL posts.
+
+        The connection is created on first use, thereafter the existing
+        connection is returned. As with urlopen() any proxy set in the
+        http_proxy or https_proxy environment variables is used. Posts to a
+        HTTP URL are sent to the proxy, posts to a HTTPS URL are tunnelled
+        through the proxy.
+
+        Returns:
+            A HTTPConnection or HTTPSConnection object.
+        """
+
+        if self.post_connection is None:
+            url = urllib.parse.urlsplit(self.remote_server_url)
+            # the path (and any query string) to which we post
+            self.post_path = url.path if url.path else '/'
+            if url.query:
+                self.post_path = '?'.join([self.post_path, url.query])
+            self.post_headers = {}
+            # is there a proxy we should use
+            proxy = urllib.request.getproxies().get(url.scheme)
+            if proxy and urllib.request.proxy_bypass(url.hostname):
+                proxy = None
+            if proxy is None:
+                host, port = url.hostname, url.port
+                proxy_headers = {}
+            else:
+                # the proxy may be given without a scheme, eg 'proxy:3128'
+                if '://' not in proxy:
+                    proxy = '//'.join(['http:', proxy])
+                proxy_url = urllib.parse.urlsplit(proxy)
+                host, port = proxy_url.hostname, proxy_url.port
+                proxy_headers = {}
+                if proxy_url.username is not None:
+                    # use basic authentication with the proxy
+                    credentials = ':'.join([urllib.parse.unquote(proxy_url.username),
+                                            urllib.parse.unquote(proxy_url.password or '')])
+                    auth = base64.b64encode(credentials.encode('utf-8')).decode('ascii')
+                    proxy_headers['Proxy-Authorization'] = 'Basic %s' % auth
+                if self.debug_post:
+                    loginf("posting to %s via proxy %s:%s" % (self.remote_server_url,
+                                                             host, port))
+            if url.scheme == 'https':
+                self.post_connection = http_client.HTTPSConnection(host,
+                                                                   port,
+                                                                   timeout=self.timeout)
+                if proxy is not None:
+                    # tunnel through the proxy, any proxy credentials are only
+                    # sent when the tunnel is set up
+                    self.post_connection.set_tunnel(url.hostname, url.port,
+                                                    headers=proxy_headers)
+            else:
+                self.post_connection = http_client.HTTPConnection(host,
+                                                                  port,
+                                                                  timeout=self.timeout)
+                if proxy is not None:
+                    # posts via a proxy use the absolute URL and carry any
+                    # proxy credentials
+                    self.post_path = urllib.parse.urlunsplit((url.scheme,
+                                                              url.netloc,
+                                                              url.path or '/',
+                                                              url.query,
+                                                              ''))
+                    self.post_headers = proxy_headers
+        return self.post_connection
+
+    def close_post_connection(self):
+        """Close the HTTP connection used for remote URL posts."""
+
+        if self.post_connection is not None:
+            try:
+                self.post_connection.close()
+            except (http_client.HTTPException, socket.error):
+                pass
+            self.post_connection = None
 
     def write_data(self, data):
         """Write the clientraw.txt file.
 
-        Takes a string containing the clientraw.txt data and writes it to file.
+        Takes utf-8 encoded clientraw.txt data and writes it to file.
+        The data is written to a temporary file in a single write which is
+        then renamed to clientraw.txt. This way anything reading clientraw.txt
+        (eg a web server) never sees a partially written file. The temporary
+        file is created with mode 0644 in the clientraw.txt directory so that
+        directory must be writable by WeeWX.
 
         Inputs:
-            data:   clientraw.txt data string
+            data:   utf-8 encoded clientraw.txt data
         """
 
-        with open(self.rtcr_path_file, "w", encoding='utf-8') as f:
-            f.write(data)
-            f.write(u'\n')
+        tmp_path_file = self.rtcr_path_file + '.tmp'
+        try:
+            fd = os.open(tmp_path_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            # os.write() may write only part of the data, a file object write
+            # writes all of it
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data + b'\n')
+            replace_file(tmp_path_file, self.rtcr_path_file)
+        except (IOError, OSError):
+            # don't leave the temporary file behind
+            try:
+                os.remove(tmp_path_file)
+            except OSError:
+                pass
+            raise
 
     def calculate(self, packet):
         """Calculate the raw clientraw numeric fields.
@@ -1294,53 +1810,79 @@ class RealtimeClientrawThread(threading.Thread):
             packet: a cached loop data packet
 
         Returns:
-            Dictionary containing the raw numeric clientraw.txt elements.
+            List containing the raw numeric clientraw.txt elements indexed by
+            clientraw.txt field number.
         """
 
-        # convert out packet to METRICWX
-        packet_wx = weewx.units.to_std_system(packet, weewx.METRICWX)
+        # convert our packet to METRICWX, the cached packet is in our buffer
+        # unit system so there is often nothing to do
+        if packet['usUnits'] == weewx.METRICWX:
+            packet_wx = packet
+        else:
+            packet_wx = weewx.units.to_std_system(packet, weewx.METRICWX)
+        # get the local time of the packet as a struct_time, several fields
+        # use it so we only need to obtain it once
+        lt = time.localtime(packet_wx['dateTime'])
+        # bind some frequently used values to local names
+        ts = packet_wx['dateTime']
+        buffer = self.buffer
         # obtain the unit and unit groups for the buffer obs we will use
-        speed_unit, speed_group = getStandardUnitType(self.buffer.unit_system,
-                                                      'windSpeed')
-        temp_unit, temp_group = getStandardUnitType(self.buffer.unit_system,
-                                                    'outTemp')
-        rain_unit, rain_group = getStandardUnitType(self.buffer.unit_system,
+        rain_unit, rain_group = getStandardUnitType(buffer.unit_system,
                                                     'rain')
-        rainrate_unit, rainrate_group = getStandardUnitType(self.buffer.unit_system,
+        rainrate_unit, rainrate_group = getStandardUnitType(buffer.unit_system,
                                                             'rainRate')
-        press_unit, press_group = getStandardUnitType(self.buffer.unit_system,
-                                                      'pressure')
-        dist_unit, dist_group = getStandardUnitType(self.buffer.unit_system,
+        dist_unit, dist_group = getStandardUnitType(buffer.unit_system,
                                                     'windrun')
-        # get an empty dict for our results
-        data = dict()
-        # preamble
-        data[0] = '12345'
+        # Our results are held in a list indexed by clientraw.txt field number.
+        # The list is reused for each generation, the fixed value fields were
+        # populated when the list was created and every other field is
+        # populated below.
+        data = self.data_buf
+        # 014 - soil temperature (Celsius), 020 to 025 and 120 to 121 - extra
+        # temperature sensors 1 to 8 (Celsius), 026 to 028 and 122 to 126 -
+        # extra humidity sensors 1 to 8, 156 - leaf wetness and 157 - soil
+        # moisture are taken directly from the packet
+        for i, fn in self.field_fns:
+            data[i] = fn(packet_wx)
+        # fields that are taken directly from the packet
+        for i, field, default in self.packet_fields:
+            value = packet_wx.get(field)
+            data[i] = value if value is not None else default
+        # get the buffer objects used by more than one field, None if the
+        # buffer does not (yet) include the obs concerned
+        wind_speed_buf = buffer.get('windSpeed')
+        rain_buf = buffer.get('rain')
+        out_temp_buf = buffer.get('outTemp')
+        rain_rate_buf = buffer.get('rainRate')
+        humidex_buf = buffer.get('humidex')
+        windchill_buf = buffer.get('windchill')
+        heatindex_buf = buffer.get('heatindex')
+        in_temp_buf = buffer.get('inTemp')
+        barometer_buf = buffer.get('barometer')
+        app_temp_buf = buffer.get('appTemp')
+        dewpoint_buf = buffer.get('dewpoint')
+        out_humidity_buf = buffer.get('outHumidity')
+        windrun_buf = buffer.get('windrun')
+        wind_buf = buffer.get('wind')
+        # the packet time in short time format, this is used for any 'time of'
+        # fields for which we have no time
+        hm_now = self.short_time_formatter(lt)
+        # function to convert buffer wind speeds to knots, if there is no
+        # known conversion we have no wind speeds
+        to_knot = self.get_converter('windSpeed', 'knot') or (lambda value: None)
         # 001 - avg speed (knots)
-        if 'windSpeed' in self.buffer:
-            av_speed = self.buffer['windSpeed'].history_avg(packet_wx['dateTime'],
-                                                            age=self.avgspeed_period)
-
-            av_speed_vt = ValueTuple(av_speed, speed_unit, speed_group)
-            try:
-                av_speed = convert(av_speed_vt, 'knot').value
-            except KeyError:
-                av_speed = None
+        if wind_speed_buf is not None:
+            av_speed = to_knot(wind_speed_buf.history_avg(ts, age=self.avgspeed_period))
         else:
             av_speed = None
         data[1] = av_speed if av_speed is not None else 0.0
         # 002 - gust (knots)
-        if 'windSpeed' in self.buffer:
+        if wind_speed_buf is not None:
             if self.gust_period > 0:
-                _gust = self.buffer['windSpeed'].history_max(packet_wx['dateTime'],
-                                                             age=self.gust_period).value
+                _gust = wind_speed_buf.history_max(ts, age=self.gust_period).value
             else:
-                _gust = self.buffer['windSpeed'].last
-            gust_vt = ValueTuple(_gust, speed_unit, speed_group)
-            try:
-                gust = convert(gust_vt, 'knot').value
-            except KeyError:
-                gust = None
+                _gust = wind_speed_buf.last
+            gust = to_knot(_gust)
         else:
             gust = None
         data[2] = gust if gust is not None else 0.0
@@ -1352,7 +1894,7 @@ class RealtimeClientrawThread(threading.Thread):
                 # we should use the last known direction, see if we can get it
                 # from our buffer
                 try:
-                    _dir = self.buffer['windDir'].last
+                    _dir = buffer['windDir'].last
                 except KeyError:
                     # could not get last known direction from the buffer so use
                     # our default
@@ -1364,159 +1906,71 @@ class RealtimeClientrawThread(threading.Thread):
             # we have a direction in the packet so use it
             _dir = packet_wx['windDir']
         data[3] = _dir
-        # 004 - outTemp (Celsius)
-        data[4] = packet_wx['outTemp'] if packet_wx['outTemp'] is not None else 0.0
-        # 005 - outHumidity
-        data[5] = packet_wx['outHumidity'] if packet_wx['outHumidity'] is not None else 0.0
-        # 006 - barometer(hPa)
-        data[6] = packet_wx['barometer'] if packet_wx['barometer'] is not None else 0.0
         # 007 - daily rain (mm)
         if 'dayRain' in packet_wx:
             day_rain_vt = ValueTuple(packet_wx['dayRain'], 'mm', 'group_rain')
-        elif 'rain' in self.buffer:
-            day_rain_vt = ValueTuple(self.buffer['rain'].day_sum,
+        elif rain_buf is not None:
+            day_rain_vt = ValueTuple(rain_buf.day_sum,
                                      rain_unit,
                                      rain_group)
         else:
             day_rain_vt = ValueTuple(None, 'mm', 'group_rain')
         day_rain = convert(day_rain_vt, 'mm').value
         data[7] = day_rain if day_rain is not None else 0.0
+        # rain (mm) since the last archive record, this is not included in the
+        # month and year rain stats which have already been converted to mm
+        if rain_buf is not None:
+            to_mm = self.get_converter('rain', 'mm')
+            interval_rain = to_mm(rain_buf.interval_sum) if to_mm is not None else None
+        else:
+            interval_rain = None
         # 008 - monthly rain
-        month_rain_vt = getattr(self, 'month_rain_vt',
-                                ValueTuple(0, 'mm', 'group_rain'))
-        try:
-            month_rain = convert(month_rain_vt, 'mm').value
-        except KeyError:
-            month_rain = None
-        if month_rain and 'rain' in self.buffer:
-            month_rain += self.buffer['rain'].interval_sum
-        elif 'rain' in self.buffer:
-            month_rain = self.buffer['rain'].interval_sum
+        # the stats value has already been converted to mm
+        month_rain = getattr(self, 'month_rain_vt',
+                             ValueTuple(0, 'mm', 'group_rain')).value
+        if month_rain and interval_rain is not None:
+            month_rain += interval_rain
+        elif rain_buf is not None:
+            month_rain = interval_rain
         else:
             month_rain = None
         data[8] = month_rain if month_rain is not None else 0.0
         # 009 - yearly rain
-        year_rain_vt = getattr(self, 'year_rain_vt',
-                               ValueTuple(0, 'mm', 'group_rain'))
-        try:
-            year_rain = convert(year_rain_vt, 'mm').value
-        except KeyError:
-            year_rain = None
-        if year_rain and 'rain' in self.buffer:
-            year_rain += self.buffer['rain'].interval_sum
-        elif 'rain' in self.buffer:
-            year_rain = self.buffer['rain'].interval_sum
+        # the stats value has already been converted to mm
+        year_rain = getattr(self, 'year_rain_vt',
+                            ValueTuple(0, 'mm', 'group_rain')).value
+        if year_rain and interval_rain is not None:
+            year_rain += interval_rain
+        elif rain_buf is not None:
+            year_rain = interval_rain
         else:
             year_rain = None
         data[9] = year_rain if year_rain is not None else 0.0
         # 010 - rain rate (mm per minute - not hour)
         data[10] = packet_wx['rainRate'] / 60.0 if packet_wx['rainRate'] is not None else 0.0
         # 011 - max daily rainRate (mm per minute - not hour)
-        if 'rainRate' in self.buffer:
-            rain_rate_th_vt = ValueTuple(self.buffer['rainRate'].day_max,
+        if rain_rate_buf is not None:
+            rain_rate_th_vt = ValueTuple(rain_rate_buf.day_max,
                                          rainrate_unit,
                                          rainrate_group)
         else:
             rain_rate_th_vt = ValueTuple(None, rainrate_unit, rainrate_group)
         rain_rate_th = convert(rain_rate_th_vt, 'mm_per_hour').value
         data[11] = rain_rate_th/60.0 if rain_rate_th is not None else 0.0
-        # 012 - inTemp (Celsius)
-        data[12] = packet_wx['inTemp'] if packet_wx['inTemp'] is not None else 0.0
-        # 013 - inHumidity
-        data[13] = packet_wx['inHumidity'] if packet_wx['inHumidity'] is not None else 0.0
-        # 014 - soil temperature (Celsius)
-        if self.soil_temp and self.soil_temp in packet_wx:
-            soil_temp = packet_wx[self.soil_temp]
-        else:
-            soil_temp = None
-        data[14] = soil_temp if soil_temp is not None else 100.0
-        # TODO. Need to implement field 15
-        # 015 - Forecast Icon
-        data[15] = 0
-        # 016 - WMR968 extra temperature (Celsius) - will not implement
-        data[16] = 0.0
-        # 017 - WMR968 extra humidity (Celsius) - will not implement
-        data[17] = 0.0
-        # 018 - WMR968 extra sensor (Celsius) - will not implement
-        data[18] = 0.0
         # 019 - yesterday rain (mm)
-        yest_rain_vt = getattr(self, 'yest_rain_vt',
-                               ValueTuple(0, 'mm', 'group_rain'))
-        try:
-            yest_rain = convert(yest_rain_vt, 'mm').value
-        except KeyError:
-            yest_rain = None
+        # the stats value has already been converted to mm
+        yest_rain = getattr(self, 'yest_rain_vt',
+                            ValueTuple(0, 'mm', 'group_rain')).value
         data[19] = yest_rain if yest_rain is not None else 0.0
-        # 020 - extra temperature sensor 1 (Celsius)
-        if self.extra_temp1 and self.extra_temp1 in packet_wx:
-            extra_temp1 = packet_wx[self.extra_temp1]
-        else:
-            extra_temp1 = None
-        data[20] = extra_temp1 if extra_temp1 is not None else -100.0
-        # 021 - extra temperature sensor 2 (Celsius)
-        if self.extra_temp2 and self.extra_temp2 in packet_wx:
-            extra_temp2 = packet_wx[self.extra_temp2]
-        else:
-            extra_temp2 = None
-        data[21] = extra_temp2 if extra_temp2 is not None else -100.0
-        # 022 - extra temperature sensor 3 (Celsius)
-        if self.extra_temp3 and self.extra_temp3 in packet_wx:
-            extra_temp3 = packet_wx[self.extra_temp3]
-        else:
-            extra_temp3 = None
-        data[22] = extra_temp3 if extra_temp3 is not None else -100.0
-        # 023 - extra temperature sensor 4 (Celsius)
-        if self.extra_temp4 and self.extra_temp4 in packet_wx:
-            extra_temp4 = packet_wx[self.extra_temp4]
-        else:
-            extra_temp4 = None
-        data[23] = extra_temp4 if extra_temp4 is not None else -100.0
-        # 024 - extra temperature sensor 5 (Celsius)
-        if self.extra_temp5 and self.extra_temp5 in packet_wx:
-            extra_temp5 = packet_wx[self.extra_temp5]
-        else:
-            extra_temp5 = None
-        data[24] = extra_temp5 if extra_temp5 is not None else -100.0
-        # 025 - extra temperature sensor 6 (Celsius)
-        if self.extra_temp6 and self.extra_temp6 in packet_wx:
-            extra_temp6 = packet_wx[self.extra_temp6]
-        else:
-            extra_temp6 = None
-        data[25] = extra_temp6 if extra_temp6 is not None else -100.0
-        # 026 - extra humidity sensor 1
-        if self.extra_hum1 and self.extra_hum1 in packet_wx:
-            extra_hum1 = packet_wx[self.extra_hum1]
-        else:
-            extra_hum1 = None
-        data[26] = extra_hum1 if extra_hum1 is not None else -100
-        # 027 - extra humidity sensor 2
-        if self.extra_hum2 and self.extra_hum2 in packet_wx:
-            extra_hum2 = packet_wx[self.extra_hum2]
-        else:
-            extra_hum2 = None
-        data[27] = extra_hum2 if extra_hum2 is not None else -100
-        # 028 - extra humidity sensor 3
-        if self.extra_hum3 and self.extra_hum3 in packet_wx:
-            extra_hum3 = packet_wx[self.extra_hum3]
-        else:
-            extra_hum3 = None
-        data[28] = extra_hum3 if extra_hum3 is not None else -100
         # 029 - hour
-        data[29] = time.strftime('%H', time.localtime(packet_wx['dateTime']))
+        data[29] = '%02d' % lt.tm_hour
         # 030 - minute
-        data[30] = time.strftime('%M', time.localtime(packet_wx['dateTime']))
+        data[30] = '%02d' % lt.tm_min
         # 031 - seconds
-        data[31] = time.strftime('%S', time.localtime(packet_wx['dateTime']))
+        data[31] = '%02d' % lt.tm_sec
         # 032 - station name
-        hms_string = time.strftime(self.long_time_fmt,
-                                   time.localtime(packet_wx['dateTime']))
-        # to maintain fidelity of station names that include dashes and spaces
-        # replace any dashes with en dashes and replace any spaces with
-        # underscores
-        loc_string = self.location.replace('-', '&ndash;')
-        data[32] = '-'.join([loc_string.replace(' ', '_'), hms_string])
-        # 033 - dallas lightning count - will not implement
-        data[33] = 0
+        hms_string = self.long_time_formatter(lt)
+        data[32] = '-'.join([self.cr_location, hms_string])
         # 034 - Solar Reading - used as 'solar percent' in Saratoga dashboards
         percent = None
         if 'radiation' in packet_wx and 'maxSolarRad' in packet_wx:
@@ -1529,308 +1983,102 @@ class RealtimeClientrawThread(threading.Thread):
                 pass
         data[34] = percent if percent is not None else 0.0
         # 035 - Day
-        data[35] = time.strftime('%-d', time.localtime(packet_wx['dateTime']))
+        data[35] = str(lt.tm_mday)
         # 036 - Month
-        data[36] = time.strftime('%-m', time.localtime(packet_wx['dateTime']))
-        # 037 - WMR968/200 battery 1 - will not implement
-        data[37] = 0.0
-        # 038 - WMR968/200 battery 2 - will not implement
-        data[38] = 0.0
-        # 039 - WMR968/200 battery 3 - will not implement
-        data[39] = 100
-        # 040 - WMR968/200 battery 4 - will not implement
-        data[40] = 100
-        # 041 - WMR968/200 battery 5 - will not implement
-        data[41] = 100
-        # 042 - WMR968/200 battery 6 - will not implement
-        data[42] = 100
-        # 043 - WMR968/200 battery 7 - will not implement
-        data[43] = 100
-        # 044 - windchill (Celsius)
-        data[44] = packet_wx['windchill'] if packet_wx['windchill'] is not None else 0.0
+        data[36] = str(lt.tm_mon)
         # 045 - humidex (Celsius)
-        if 'humidex' in packet_wx:
-            humidex = packet_wx['humidex']
-        elif 'outTemp' in packet_wx and 'outHumidity' in packet_wx:
-            humidex = weewx.wxformulas.humidexC(packet_wx['outTemp'],
-                                                packet_wx['outHumidity'])
-        else:
-            humidex = None
+        humidex = packet_wx.get('humidex')
+        if humidex is None:
+            # we have no humidex in the packet so calculate it, humidexC()
+            # returns None if either outTemp or outHumidity is None
+            humidex = weewx.wxformulas.humidexC(packet_wx.get('outTemp'),
+                                                packet_wx.get('outHumidity'))
         data[45] = humidex if humidex is not None else 0.0
         # 046 - maximum day temperature (Celsius)
-        if 'outTemp' in self.buffer:
-            temp_th_vt = ValueTuple(self.buffer['outTemp'].day_max,
-                                    temp_unit,
-                                    temp_group)
-        else:
-            temp_th_vt = ValueTuple(None, temp_unit, temp_group)
-        temp_th = convert(temp_th_vt, 'degree_C').value
-        data[46] = temp_th if temp_th is not None else 0.0
         # 047 - minimum day temperature (Celsius)
-        if 'outTemp' in self.buffer:
-            temp_tl_vt = ValueTuple(self.buffer['outTemp'].day_min,
-                                    temp_unit,
-                                    temp_group)
-        else:
-            temp_tl_vt = ValueTuple(None, temp_unit, temp_group)
-        temp_tl = convert(temp_tl_vt, 'degree_C').value
-        data[47] = temp_tl if temp_tl is not None else 0.0
-        # TODO. Need to implement field 48
-        # 048 - icon type
-        data[48] = 0
-        # TODO. Need to implement field 49
-        # 049 - weather description
-        data[49] = '---'
+        data[46], data[47] = self.day_hilo(out_temp_buf, 'outTemp', 'degree_C')
         # 050 - barometer trend (hPa)
         baro_vt = ValueTuple(packet_wx['barometer'], 'hPa', 'group_pressure')
-        baro_trend = calc_trend('barometer', baro_vt, self.db_manager,
-                                packet_wx['dateTime'] - self.baro_trend_period,
+        baro_trend = calc_trend('barometer', baro_vt, self.archive_cache,
+                                ts - self.baro_trend_period,
                                 self.grace)
         data[50] = baro_trend if baro_trend is not None else 0.0
-        # 051-070 incl - windspeed hour 01-20 incl (knots) - will not implement
-        for h in range(0, 20):
-            data[51+h] = 0.0
         # 071 - maximum wind gust today
-        if 'windSpeed' in self.buffer:
-            wind_gust_tm = self.buffer['windSpeed'].day_max
+        if wind_speed_buf is not None:
+            wind_gust_tm = to_knot(wind_speed_buf.day_max)
         else:
-            wind_gust_tm = 0.0
-        # our speeds are in m/s need to convert to knots
-        wind_gust_tm_vt = ValueTuple(wind_gust_tm, speed_unit, speed_group)
-        try:
-            wind_gust_tm = convert(wind_gust_tm_vt, 'knot').value
-        except KeyError:
             wind_gust_tm = None
         data[71] = wind_gust_tm if wind_gust_tm is not None else 0.0
-        # 072 - dewpoint (Celsius)
-        data[72] = packet_wx['dewpoint'] if packet_wx['dewpoint'] is not None else 0.0
         # 073 - cloud height (foot)
         if 'cloudbase' in packet_wx:
             cb = packet_wx['cloudbase']
         else:
-            if 'outTemp' in packet_wx and 'outHumidity' in packet_wx:
-                cb = weewx.wxformulas.cloudbase_Metric(packet_wx['outTemp'],
-                                                       packet_wx['outHumidity'],
-                                                       self.altitude_m)
-            else:
-                cb = None
+            cb = self.get_cloudbase(packet_wx.get('outTemp'),
+                                    packet_wx.get('outHumidity'))
         # our altitudes are in metres, need to convert to feet
-        cloudbase_vt = ValueTuple(cb, 'meter', 'group_altitude')
-        try:
-            cloudbase = convert(cloudbase_vt, 'foot').value
-        except KeyError:
-            cloudbase = None
-        data[73] = cloudbase if cloudbase is not None else 0.0
+        data[73] = cb / METER_PER_FOOT if cb is not None else 0.0
         # 074 -  date
-        data[74] = time.strftime(self.date_fmt, time.localtime(packet_wx['dateTime']))
+        data[74] = self.date_formatter(lt)
         # 075 - maximum day humidex (Celsius)
         # 076 - minimum day humidex (Celsius)
-        if 'humidex' in self.buffer:
-            humidex_th_vt = ValueTuple(self.buffer['humidex'].day_max,
-                                       temp_unit,
-                                       temp_group)
-            humidex_tl_vt = ValueTuple(self.buffer['humidex'].day_min,
-                                       temp_unit,
-                                       temp_group)
-        else:
-            humidex_th_vt = ValueTuple(None, temp_unit, temp_group)
-            humidex_tl_vt = ValueTuple(None, temp_unit, temp_group)
-        humidex_th = convert(humidex_th_vt, 'degree_C').value
-        humidex_tl = convert(humidex_tl_vt, 'degree_C').value
-        data[75] = humidex_th if humidex_th is not None else 0.0
-        data[76] = humidex_tl if humidex_tl is not None else 0.0
+        data[75], data[76] = self.day_hilo(humidex_buf, 'humidex', 'degree_C')
         # 077 - maximum day windchill (Celsius)
         # 078 - minimum day windchill (Celsius)
-        if 'windchill' in self.buffer:
-            windchill_th_vt = ValueTuple(self.buffer['windchill'].day_max,
-                                         temp_unit,
-                                         temp_group)
-            windchill_tl_vt = ValueTuple(self.buffer['windchill'].day_min,
-                                         temp_unit,
-                                         temp_group)
-        else:
-            windchill_th_vt = ValueTuple(None, temp_unit, temp_group)
-            windchill_tl_vt = ValueTuple(None, temp_unit, temp_group)
-        windchill_th = convert(windchill_th_vt, 'degree_C').value
-        windchill_tl = convert(windchill_tl_vt, 'degree_C').value
-        data[77] = windchill_th if windchill_th is not None else 0.0
-        data[78] = windchill_tl if windchill_tl is not None else 0.0
-        # 079 - Davis VP UV
-        data[79] = packet_wx['UV'] if packet_wx['UV'] is not None else 0
-        # 080-089 - hour wind speed 01-10 - will not implement
-        for h in range(0, 10):
-            data[80+h] = 0.0
+        data[77], data[78] = self.day_hilo(windchill_buf, 'windchill', 'degree_C')
         # 090 - hour temperature 01 (Celsius)
         hour_ago_outtemp_vt = getattr(self, 'hour_ago_outTemp_vt',
                                       ValueTuple(None, 'degree_C', 'group_temperature'))
-        try:
-            hour_ago_outtemp = convert(hour_ago_outtemp_vt, 'degree_C').value
-        except KeyError:
-            hour_ago_outtemp = None
+        hour_ago_outtemp = hour_ago_outtemp_vt.value
         data[90] = hour_ago_outtemp if hour_ago_outtemp is not None else 0.0
-        # 091-099 - hour temperature 02-10 (Celsius) - will not implement
-        for h in range(0, 9):
-            data[91+h] = 0.0
-        # 100-109 - hour rain 01-10 (mm) - will not implement
-        for h in range(0, 10):
-            data[100+h] = 0.0
         # 110 - maximum day heatindex (Celsius)
         # 111 - minimum day heatindex (Celsius)
-        if 'heatindex' in self.buffer:
-            heatindex_th_vt = ValueTuple(self.buffer['heatindex'].day_max,
-                                         temp_unit,
-                                         temp_group)
-            heatindex_tl_vt = ValueTuple(self.buffer['heatindex'].day_min,
-                                         temp_unit,
-                                         temp_group)
-        else:
-            heatindex_th_vt = ValueTuple(None, temp_unit, temp_group)
-            heatindex_tl_vt = ValueTuple(None, temp_unit, temp_group)
-        heatindex_th = convert(heatindex_th_vt, 'degree_C').value
-        heatindex_tl = convert(heatindex_tl_vt, 'degree_C').value
-        data[110] = heatindex_th if heatindex_th is not None else 0.0
-        data[111] = heatindex_tl if heatindex_tl is not None else 0.0
-        # 112 - heatindex (Celsius)
-        data[112] = packet_wx['heatindex'] if packet_wx['heatindex'] is not None else 0.0
+        data[110], data[111] = self.day_hilo(heatindex_buf, 'heatindex', 'degree_C')
         # 113 - maximum average speed (knot)
-        if 'windSpeed' in self.buffer:
-            windspeed_tm_loop = self.buffer['windSpeed'].day_max
+        if wind_speed_buf is not None:
+            windspeed_tm_loop = wind_speed_buf.day_max
         else:
             windspeed_tm_loop = 0.0
         if 'windSpeed' in self.day_stats:
             windspeed_tm = self.day_stats['windSpeed'].max
         else:
             windspeed_tm = 0.0
-        windspeed_tm = weeutil.weeutil.max_with_none([windspeed_tm, windspeed_tm_loop])
-        windspeed_tm_vt = ValueTuple(windspeed_tm, speed_unit, speed_group)
-        try:
-            windspeed_tm = convert(windspeed_tm_vt, 'knot').value
-        except KeyError:
-            windspeed_tm = None
+        windspeed_tm = to_knot(max2(windspeed_tm, windspeed_tm_loop))
         data[113] = windspeed_tm if windspeed_tm is not None else 0.0
-        # 114 - lightning count in last minute - will not implement
-        data[114] = 0
-        # 115 - time of last lightning strike - will not implement
-        data[115] = '---'
-        # 116 - date of last lightning strike - will not implement
-        data[116] = '---'
         # 117 - wind average direction
-        data[117] = self.buffer['wind'].vec_dir
-        # 118 - nexstorm distance - will not implement
-        data[118] = 0.0
-        # 119 - nexstorm bearing - will not implement
-        data[119] = 0.0
-        # 120 - extra temperature sensor 7 (Celsius)
-        if self.extra_temp7 and self.extra_temp7 in packet_wx:
-            extra_temp7 = packet_wx[self.extra_temp7]
-        else:
-            extra_temp7 = None
-        data[120] = extra_temp7 if extra_temp7 is not None else -100
-        # 121 - extra temperature sensor 8 (Celsius)
-        if self.extra_temp8 and self.extra_temp8 in packet_wx:
-            extra_temp8 = packet_wx[self.extra_temp8]
-        else:
-            extra_temp8 = None
-        data[121] = extra_temp8 if extra_temp8 is not None else -100
-        # 122 - extra humidity sensor 4
-        if self.extra_hum4 and self.extra_hum4 in packet_wx:
-            extra_hum4 = packet_wx[self.extra_hum4]
-        else:
-            extra_hum4 = None
-        data[122] = extra_hum4 if extra_hum4 is not None else -100
-        # 123 - extra humidity sensor 5
-        if self.extra_hum5 and self.extra_hum5 in packet_wx:
-            extra_hum5 = packet_wx[self.extra_hum5]
-        else:
-            extra_hum5 = None
-        data[123] = extra_hum5 if extra_hum5 is not None else -100
-        # 124 - extra humidity sensor 6
-        if self.extra_hum6 and self.extra_hum6 in packet_wx:
-            extra_hum6 = packet_wx[self.extra_hum6]
-        else:
-            extra_hum6 = None
-        data[124] = extra_hum6 if extra_hum6 is not None else -100
-        # 125 - extra humidity sensor 7
-        if self.extra_hum7 and self.extra_hum7 in packet_wx:
-            extra_hum7 = packet_wx[self.extra_hum7]
-        else:
-            extra_hum7 = None
-        data[125] = extra_hum7 if extra_hum7 is not None else -100
-        # 126 - extra humidity sensor 8
-        if self.extra_hum8 and self.extra_hum8 in packet_wx:
-            extra_hum8 = packet_wx[self.extra_hum8]
-        else:
-            extra_hum8 = None
-        data[126] = extra_hum8 if extra_hum8 is not None else -100
-        # 127 - VP solar
-        data[127] = packet_wx['radiation'] if packet_wx['radiation'] is not None else 0.0
+        data[117] = wind_buf.vec_dir
         # 128 - maximum inTemp (Celsius)
         # 129 - minimum inTemp (Celsius)
-        if 'inTemp' in self.buffer:
-            intemp_th_vt = ValueTuple(self.buffer['inTemp'].day_max,
-                                      temp_unit,
-                                      temp_group)
-            intemp_tl_vt = ValueTuple(self.buffer['inTemp'].day_min,
-                                      temp_unit,
-                                      temp_group)
-        else:
-            intemp_th_vt = ValueTuple(None, temp_unit, temp_group)
-            intemp_tl_vt = ValueTuple(None, temp_unit, temp_group)
-        intemp_th = convert(intemp_th_vt, 'degree_C').value
-        intemp_tl = convert(intemp_tl_vt, 'degree_C').value
-        data[128] = intemp_th if intemp_th is not None else 0.0
-        data[129] = intemp_tl if intemp_tl is not None else 0.0
+        data[128], data[129] = self.day_hilo(in_temp_buf, 'inTemp', 'degree_C')
         # 130 - appTemp (Celsius)
-        if 'appTemp' in packet_wx:
-            app_temp = packet_wx['appTemp']
-        elif 'windSpeed' in packet_wx and 'outTemp' in packet_wx and 'outHumidity' in packet_wx:
-            app_temp = weewx.wxformulas.apptempC(packet_wx['outTemp'],
-                                                 packet_wx['outHumidity'],
-                                                 packet_wx['windSpeed'])
-        else:
-            app_temp = None
+        app_temp = packet_wx.get('appTemp')
+        if app_temp is None:
+            # we have no appTemp so calculate it, apptempC() returns None if
+            # any of the inputs are None, our packet is METRICWX so windSpeed
+            # is already in m/s
+            app_temp = self.get_app_temp(packet_wx.get('outTemp'),
+                                         packet_wx.get('outHumidity'),
+                                         packet_wx.get('windSpeed'))
         data[130] = app_temp if app_temp is not None else 0.0
         # 131 - maximum barometer (hPa)
         # 132 - minimum barometer (hPa)
-        if 'barometer' in self.buffer:
-            barometer_th_vt = ValueTuple(self.buffer['barometer'].day_max,
-                                         press_unit,
-                                         press_group)
-            barometer_tl_vt = ValueTuple(self.buffer['barometer'].day_min,
-                                         press_unit,
-                                         press_group)
-        else:
-            barometer_th_vt = ValueTuple(None, press_unit, press_group)
-            barometer_tl_vt = ValueTuple(None, press_unit, press_group)
-        barometer_th = convert(barometer_th_vt, 'hPa').value
-        barometer_tl = convert(barometer_tl_vt, 'hPa').value
-        data[131] = barometer_th if barometer_th is not None else 0.0
-        data[132] = barometer_tl if barometer_tl is not None else 0.0
+        data[131], data[132] = self.day_hilo(barometer_buf, 'barometer', 'hPa')
         # 133 - maximum windGust last hour (knot)
         hour_gust_vt = getattr(self, 'hour_gust_vt',
                                ValueTuple(0.0, 'knot', 'group_speed'))
-        if hour_gust_vt.value is not None:
-            hour_gust = convert(hour_gust_vt, 'knot').value
-        else:
-            hour_gust = 0.0
-        if hour_gust_vt.value and 'windSpeed' in self.buffer:
-            windspeed_tm_loop_vt = ValueTuple(self.buffer['windSpeed'].day_max,
-                                              speed_unit,
-                                              speed_group)
-            windspeed_tm_loop = convert(windspeed_tm_loop_vt, 'knot').value
+        hour_gust = hour_gust_vt.value if hour_gust_vt.value is not None else 0.0
+        if hour_gust_vt.value and wind_speed_buf is not None:
+            windspeed_tm_loop = to_knot(wind_speed_buf.day_max)
         else:
             windspeed_tm_loop = None
-        windgust60 = weeutil.weeutil.max_with_none([hour_gust,
-                                                    windspeed_tm_loop])
+        windgust60 = max2(hour_gust, windspeed_tm_loop)
         data[133] = windgust60 if windgust60 is not None else 0.0
         # 134 - maximum windGust in last hour time
         hour_gust_ts = getattr(self, 'hour_gust_ts', None)
-        if 'windSpeed' in self.buffer:
-            buffer_ot = self.buffer['windSpeed'].history_max(packet_wx['dateTime'])
+        if wind_speed_buf is not None:
+            buffer_ot = wind_speed_buf.history_max(ts)
         else:
             buffer_ot = ObsTuple(None, None)
-        buffer_ot_knot = convert(ValueTuple(buffer_ot.value, speed_unit, speed_group),
-                                 'knot').value
+        buffer_ot_knot = to_knot(buffer_ot.value)
         if hour_gust is None:
             windgust60_ts = buffer_ot.ts
         elif buffer_ot.value is None:
@@ -1839,156 +2087,72 @@ class RealtimeClientrawThread(threading.Thread):
             windgust60_ts = buffer_ot.ts
         else:
             windgust60_ts = hour_gust_ts
-        data[134] = time.strftime(self.short_time_fmt, time.localtime(windgust60_ts)) if \
+        data[134] = self.short_time_formatter(time.localtime(windgust60_ts)) if \
             windgust60_ts is not None else '00:00'
         # 135 - maximum windGust today time
-        if 'windSpeed' in self.buffer:
-            t_windgust_tm_ts = self.buffer['windSpeed'].day_maxtime
-            if t_windgust_tm_ts is not None:
-                t_windgust_tm = time.localtime(t_windgust_tm_ts)
-            else:
-                t_windgust_tm = time.localtime(packet_wx['dateTime'])
+        if wind_speed_buf is not None and wind_speed_buf.day_maxtime is not None:
+            data[135] = self.short_time_formatter(time.localtime(wind_speed_buf.day_maxtime))
         else:
-            t_windgust_tm = time.localtime(packet_wx['dateTime'])
-        data[135] = time.strftime(self.short_time_fmt, t_windgust_tm)
+            data[135] = hm_now
         # 136 - maximum day appTemp (Celsius)
         # 137 - minimum day appTemp (Celsius)
-        if 'appTemp' in self.buffer:
-            apptemp_th_vt = ValueTuple(self.buffer['appTemp'].day_max,
-                                       temp_unit,
-                                       temp_group)
-            apptemp_tl_vt = ValueTuple(self.buffer['appTemp'].day_min,
-                                       temp_unit,
-                                       temp_group)
-        else:
-            apptemp_th_vt = ValueTuple(None, temp_unit, temp_group)
-            apptemp_tl_vt = ValueTuple(None, temp_unit, temp_group)
-        apptemp_th = convert(apptemp_th_vt, 'degree_C').value
-        apptemp_tl = convert(apptemp_tl_vt, 'degree_C').value
-        data[136] = apptemp_th if apptemp_th is not None else 0.0
-        data[137] = apptemp_tl if apptemp_tl is not None else 0.0
+        data[136], data[137] = self.day_hilo(app_temp_buf, 'appTemp', 'degree_C')
         # 138 - maximum day dewpoint (Celsius)
         # 139 - minimum day dewpoint (Celsius)
-        if 'dewpoint' in self.buffer:
-            dewpoint_th_vt = ValueTuple(self.buffer['dewpoint'].day_max,
-                                        temp_unit,
-                                        temp_group)
-            dewpoint_tl_vt = ValueTuple(self.buffer['dewpoint'].day_min,
-                                        temp_unit,
-                                        temp_group)
-        else:
-            dewpoint_th_vt = ValueTuple(None, temp_unit, temp_group)
-            dewpoint_tl_vt = ValueTuple(None, temp_unit, temp_group)
-        dewpoint_th = convert(dewpoint_th_vt, 'degree_C').value
-        dewpoint_tl = convert(dewpoint_tl_vt, 'degree_C').value
-        data[138] = dewpoint_th if dewpoint_th is not None else 0.0
-        data[139] = dewpoint_tl if dewpoint_tl is not None else 0.0
+        data[138], data[139] = self.day_hilo(dewpoint_buf, 'dewpoint', 'degree_C')
         # 140 - maximum windGust in last minute (knot)
-        if 'windSpeed' in self.buffer:
-            _gust1_ot = self.buffer['windSpeed'].history_max(packet_wx['dateTime'],
-                                                             age=60)
-            gust1_vt = ValueTuple(_gust1_ot.value, speed_unit, speed_group)
-            try:
-                gust1 = convert(gust1_vt, 'knot').value
-            except KeyError:
-                gust1 = None
+        if wind_speed_buf is not None:
+            gust1 = to_knot(wind_speed_buf.history_max(ts, age=60).value)
+            # field 158 uses the same buffer so obtain it now
+            av_speed10 = to_knot(wind_speed_buf.history_avg(ts, age=600))
         else:
             gust1 = None
+            av_speed10 = None
         data[140] = gust1 if gust1 is not None else 0.0
         # 141 - current year
-        data[141] = time.strftime('%Y', time.localtime(packet_wx['dateTime']))
-        # 142 - THSWS - will not implement
-        data[142] = 0.0
+        data[141] = str(lt.tm_year)
         # 143 - outTemp trend (logic)
         temp_vt = ValueTuple(packet_wx['outTemp'], 'degree_C', 'group_temperature')
-        temp_trend = calc_trend('outTemp', temp_vt, self.db_manager,
-                                packet_wx['dateTime'] - self.temp_trend_period,
+        temp_trend = calc_trend('outTemp', temp_vt, self.archive_cache,
+                                ts - self.temp_trend_period,
                                 self.grace)
-        if temp_trend is None or temp_trend == 0:
-            _trend = '0'
-        elif temp_trend > 0:
-            _trend = '+1'
-        else:
-            _trend = '-1'
-        data[143] = _trend
+        data[143] = trend_sign(temp_trend)
         # 144 - outHumidity trend (logic)
         hum_vt = ValueTuple(packet_wx['outHumidity'], 'percent', 'group_percent')
-        hum_trend = calc_trend('outHumidity', hum_vt, self.db_manager,
-                               packet_wx['dateTime'] - self.humidity_trend_period,
+        hum_trend = calc_trend('outHumidity', hum_vt, self.archive_cache,
+                               ts - self.humidity_trend_period,
                                self.grace)
-        if hum_trend is None or hum_trend == 0:
-            _trend = '0'
-        elif hum_trend > 0:
-            _trend = '+1'
-        else:
-            _trend = '-1'
-        data[144] = _trend
+        data[144] = trend_sign(hum_trend)
         # 145 - humidex trend (logic)
         humidex_vt = ValueTuple(packet_wx['humidex'], 'degree_C', 'group_temperature')
-        humidex_trend = calc_trend('humidex', humidex_vt, self.db_manager,
-                                   packet_wx['dateTime'] - self.humidex_trend_period,
+        humidex_trend = calc_trend('humidex', humidex_vt, self.archive_cache,
+                                   ts - self.humidex_trend_period,
                                    self.grace)
-        if humidex_trend is None or humidex_trend == 0:
-            _trend = '0'
-        elif humidex_trend > 0:
-            _trend = '+1'
-        else:
-            _trend = '-1'
-        data[145] = _trend
-        # 146-155 - hour wind direction 01-10 - will not implement
-        for h in range(0, 10):
-            data[146+h] = 0.0
-        # 156 - leaf wetness
-        if self.leaf_wet and self.leaf_wet in packet_wx:
-            leaf_wet = packet_wx[self.leaf_wet]
-        else:
-            leaf_wet = None
-        data[156] = leaf_wet if leaf_wet is not None else 0.0
-        # 157 - soil moisture
-        if self.soil_moist and self.soil_moist in packet_wx:
-            soil_moist = packet_wx[self.soil_moist]
-        else:
-            soil_moist = None
-        data[157] = soil_moist if soil_moist is not None else 255.0
-        # 158 - 10-minute average wind speed (knot)
-        if 'windSpeed' in self.buffer:
-            av_speed10 = self.buffer['windSpeed'].history_avg(packet_wx['dateTime'],
-                                                              age=600)
-            av_speed10_vt = ValueTuple(av_speed10, speed_unit, speed_group)
-            try:
-                av_speed10 = convert(av_speed10_vt, 'knot').value
-            except KeyError:
-                av_speed10 = None
-        else:
-            av_speed10 = None
+        data[145] = trend_sign(humidex_trend)
+        # 158 - 10-minute average wind speed (knot), obtained with field 140
         data[158] = av_speed10 if av_speed10 is not None else 0.0
         # 159 - wet bulb temperature (Celsius)
         wb = packet_wx.get('wet_bulb')
         data[159] = wb if wb is not None else 0.0
-        # 160 - latitude (-ve for south)
-        data[160] = self.latitude
-        # 161 -  longitude (-ve for east)
-        data[161] = -1 * self.longitude
+        # 160 - latitude (-ve for south) and 161 - longitude (-ve for east)
+        # are fixed and were populated when the data list was created
         # 162 - 9am reset rainfall total (mm)
-        nineam_rain_vt = ValueTuple(self.buffer['rain'].nineam_sum,
-                                    rain_unit,
-                                    rain_group)
-        data[162] = convert(nineam_rain_vt, 'mm').value
+        if rain_buf is not None:
+            nineam_rain_vt = ValueTuple(rain_buf.nineam_sum,
+                                        rain_unit,
+                                        rain_group)
+        else:
+            nineam_rain_vt = ValueTuple(None, 'mm', 'group_rain')
+        nineam_rain = convert(nineam_rain_vt, 'mm').value
+        data[162] = nineam_rain if nineam_rain is not None else 0.0
         # 163 - high day outHumidity
         # 164 - low day outHumidity
-        if 'outHumidity' in self.buffer:
-            outhumidity_th = self.buffer['outHumidity'].day_max
-            outhumidity_tl = self.buffer['outHumidity'].day_min
-        else:
-            outhumidity_th = None
-            outhumidity_tl = None
-        data[163] = outhumidity_th if outhumidity_th is not None else 0.0
-        data[164] = outhumidity_tl if outhumidity_tl is not None else 0.0
+        data[163], data[164] = self.day_hilo(out_humidity_buf, 'outHumidity', 'percent')
         # 165 - midnight rain reset total (mm)
         if 'dayRain' in packet_wx:
             day_rain = packet_wx['dayRain']
-        elif 'rain' in self.buffer:
-            day_rain_vt = ValueTuple(self.buffer['rain'].day_sum,
+        elif rain_buf is not None:
+            day_rain_vt = ValueTuple(rain_buf.day_sum,
                                      rain_unit,
                                      rain_group)
             day_rain = convert(day_rain_vt, 'mm').value
@@ -1996,30 +2160,13 @@ class RealtimeClientrawThread(threading.Thread):
             day_rain = None
         data[165] = day_rain if day_rain is not None else 0.0
         # 166 - low day windchill time
-        if 'windchill' in self.buffer:
-            t_windchill_tm_ts = self.buffer['windchill'].day_mintime
-            if t_windchill_tm_ts is not None:
-                t_windchill_tm = time.localtime(t_windchill_tm_ts)
-            else:
-                t_windchill_tm = time.localtime(packet_wx['dateTime'])
+        if windchill_buf is not None and windchill_buf.day_mintime is not None:
+            data[166] = self.short_time_formatter(time.localtime(windchill_buf.day_mintime))
         else:
-            t_windchill_tm = time.localtime(packet_wx['dateTime'])
-        data[166] = time.strftime(self.short_time_fmt, t_windchill_tm)
-        # 167 - Current Cost Channel 1 - will not implement
-        data[167] = 0.0
-        # 168 - Current Cost Channel 2 - will not implement
-        data[168] = 0.0
-        # 169 - Current Cost Channel 3 - will not implement
-        data[169] = 0.0
-        # 170 - Current Cost Channel 4 - will not implement
-        data[170] = 0.0
-        # 171 - Current Cost Channel 5 - will not implement
-        data[171] = 0.0
-        # 172 - Current Cost Channel 6 - will not implement
-        data[172] = 0.0
+            data[166] = hm_now
         # 173 - day windrun
-        if 'windrun' in self.buffer:
-            day_windrun_vt = ValueTuple(self.buffer['windrun'].day_sum,
+        if windrun_buf is not None:
+            day_windrun_vt = ValueTuple(windrun_buf.day_sum,
                                         dist_unit,
                                         dist_group)
         else:
@@ -2027,101 +2174,99 @@ class RealtimeClientrawThread(threading.Thread):
         day_windrun = convert(day_windrun_vt, 'km').value
         data[173] = day_windrun if day_windrun is not None else 0.0
         # 174 - Time of daily max temp
-        if 'outTemp' in self.buffer:
-            t_outtemp_tm_ts = self.buffer['outTemp'].day_maxtime
-            if t_outtemp_tm_ts is not None:
-                t_outtemp_tm = time.localtime(t_outtemp_tm_ts)
-            else:
-                t_outtemp_tm = time.localtime(packet_wx['dateTime'])
+        if out_temp_buf is not None and out_temp_buf.day_maxtime is not None:
+            data[174] = self.short_time_formatter(time.localtime(out_temp_buf.day_maxtime))
         else:
-            t_outtemp_tm = time.localtime(packet_wx['dateTime'])
-        data[174] = time.strftime(self.short_time_fmt, t_outtemp_tm)
+            data[174] = hm_now
         # 175 - Time of daily min temp
-        if 'outTemp' in self.buffer:
-            t_outtemp_tm_ts = self.buffer['outTemp'].day_mintime
-            if t_outtemp_tm_ts is not None:
-                t_outtemp_tm = time.localtime(t_outtemp_tm_ts)
-            else:
-                t_outtemp_tm = time.localtime(packet_wx['dateTime'])
+        if out_temp_buf is not None and out_temp_buf.day_mintime is not None:
+            data[175] = self.short_time_formatter(time.localtime(out_temp_buf.day_mintime))
         else:
-            t_outtemp_tm = time.localtime(packet_wx['dateTime'])
-        data[175] = time.strftime(self.short_time_fmt, t_outtemp_tm)
+            data[175] = hm_now
         # TODO. Need to verify #176 calculation
         # 176 - 10 minute average wind direction
-        _mag, _dir = self.buffer['wind'].history_vec_avg(packet_wx['dateTime'],
-                                                         age=600)
+        _mag, _dir = wind_buf.history_vec_avg(ts,
+                                              age=600)
         data[176] = _dir if _dir is not None else 0
-        # 177 - record end (WD Version)
-        data[177] = '!!WS%s!!' % RTCR_VERSION
         return data
 
-    def create_clientraw_string(self, data):
-        """Create the clientraw string from the clientraw data.
+    def get_cloudbase(self, temp, humidity):
+        """Calculate the cloud base.
 
-        The raw clientraw data is a dict of numbers and strings. This method
-        formats each field appropriately and generates the unicode string that
-        comprises the clientraw.txt file contents.
+        Used when a packet does not include cloudbase. Temperature and
+        humidity often do not change from one loop packet to the next so the
+        result is cached and only recalculated when the inputs change.
 
-        Input:
-            data: a dict containing the raw clientraw data
+        Inputs:
+            temp:     outTemp in Celsius
+            humidity: outHumidity in percent
 
         Returns:
-            A unicode string containing the formatted clientraw.txt contents.
+            The cloud base in metres or None if it could not be calculated.
         """
 
-        # initialise a list to hold our fields in order
-        fields = list()
-        # iterate over the number of fields we know how to format
-        for field_num in range(len(self.field_formats)):
-            # format the field using the lookup result from the fields_format
-            # dict and append it to the field list
-            fields.append(self.format(data[field_num],
-                                      self.field_formats[field_num]))
-        # join the fields with a space between fields and force the result to
-        # be a unicode string
-        return six.ensure_text(' '.join(fields))
-
-    @staticmethod
-    def format(data, places=None):
-        """Format a number as a string with a given number of decimal places.
+        inputs = (temp, humidity)
+        if self.cloudbase_cache[0] != inputs:
+            cloudbase = weewx.wxformulas.cloudbase_Metric(temp,
+                                                          humidity,
+                                                          self.altitude_m)
+            self.cloudbase_cache = (inputs, cloudbase)
+        return self.cloudbase_cache[1]
+
+    def get_app_temp(self, temp, humidity, wind_speed):
+        """Calculate the apparent temperature.
+
+        Used when a packet does not include appTemp. The result is cached and
+        only recalculated when the inputs change.
 
         Inputs:
-            data:   The data to be formatted. May be a number or string
-                    representation of a number.
-            places: The number of decimal places to which the data will be
-                    rounded.
+            temp:       outTemp in Celsius
+            humidity:   outHumidity in percent
+            wind_speed: windSpeed in m/s
 
         Returns:
-            A string containing the data rounded and formatted to places
-            decimal places. If data is None '0.0' is returned. If places is
-            None or omitted the data is returned as received but converted to a
-            string.
+            The apparent temperature in Celsius or None if it could not be
+            calculated.
         """
 
-        # Attempt to convert our data to a string, this will be the result we
-        # return if we cannot format as specified. Our data could be a unicode
-        # string so be prepared to catch the error.
-        try:
-            result = str(data)
-        except UnicodeEncodeError:
-            # our data is a unicode string so coalesce to a six.text_type
-            result = six.ensure_text(data)
-        # if our data is None then w don't want to return 'None'
-        # (str(None) == 'None') so return '0.0' instead
-        if data is None:
-            result = '0.0'
-        # If places is not None then format as a float to 'places' decimal
-        # places. Be prepared to catch any errors and pass through our original
-        # data.
-        elif places is not None:
+        inputs = (temp, humidity, wind_speed)
+        if self.app_temp_cache[0] != inputs:
+            app_temp = weewx.wxformulas.apptempC(temp, humidity, wind_speed)
+            self.app_temp_cache = (inputs, app_temp)
+        return self.app_temp_cache[1]
+
+    def create_clientraw_string(self, data):
+        """Create the clientraw string from the clientraw data.
+
+        The raw clientraw data is a list of numbers and strings indexed by
+        clientraw.txt field number. This method formats each field
+        appropriately and generates the unicode string that comprises the
+        clientraw.txt file contents.
+
+        Input:
+            data: a list containing the raw clientraw data
+
+        Returns:
+            A unicode string containing the formatted clientraw.txt contents.
+        """
+
+        # Most of the time every formatted field is a number, in that case we
+        # can format the entire record in one operation. The fixed value fields
+        # are already part of our record format string so only the variable
+        # fields are needed. If there are any None values, or any of the
+        # formatted fields cannot be formatted as a float, format each field
+        # individually instead.
+        values = self.var_fields(data)
+        if None not in values:
             try:
-                _v = float(data)
-                _format = "%%.%df" % places
-                result = _format % _v
-            except ValueError:
+                return six.ensure_text(self.record_fmt % values)
+            except (TypeError, ValueError):
                 pass
-        # finally return our result
-        return result
+        # format each field using the format string for that field, join the
+        # fields with a space between fields and force the result to be a
+        # unicode string
+        return six.ensure_text(' '.join([render_field(field_data, fmt)
+                                         for field_data, fmt in zip(data, self.field_fmts)]))
 
 
 # ============================================================================
@@ -2131,31 +2276,49 @@ class RealtimeClientrawThread(threading.Thread):
 class VectorBuffer(object):
     """Class to buffer vector obs."""
 
+    # There is a buffer object per buffered obs for the life of the service so
+    # use slots rather than a per instance dict. The history and sum
+    # attributes are only set if the buffer keeps a history or sums.
+    __slots__ = ('last', 'lasttime', 'day_min', 'day_mintime', 'day_max',
+                 'day_maxtime', 'history', 'history_full', 'max_history',
+                 'history_sum', 'history_xsum', 'history_ysum',
+                 'history_nonzero', 'history_removed', 'has_sum', 'day_sum',
+                 'day_xsum', 'day_ysum', 'nineam_sum', 'interval_sum')
+
     default_init = (None, None, None, None)
 
     def __init__(self, stats, history=False, sum=False):
         self.last = None
         self.lasttime = None
-        if stats:
-            self.day_min = stats.min
-            self.day_mintime = stats.mintime
-            self.day_max = stats.max
-            self.day_maxtime = stats.maxtime
-        else:
-            (self.day_min, self.day_mintime,
-             self.day_max, self.day_maxtime) = VectorBuffer.default_init
+        (self.day_min, self.day_mintime,
+         self.day_max, self.day_maxtime) = unpack_hilo_stats(stats,
+                                                             VectorBuffer.default_init)
         if history:
-            self.history = []
+            self.history = deque()
             self.history_full = False
+            # The history samples that could be the max value of a history
+            # period ending now. Each sample is no less than every later
+            # sample, so the first sample in a period is the max value for
+            # that period.
+            self.max_history = deque()
+            # running sums of the speed and speed weighted x and y components
+            # in my history
+            self.history_sum = 0.0
+            self.history_xsum = 0.0
+            self.history_ysum = 0.0
+            # The number of non-zero speeds in my history and the number of
+            # samples removed from my history since my running sums were last
+            # recalculated. Used to stop rounding errors accumulating in my
+            # running sums.
+            self.history_nonzero = 0
+            self.history_removed = 0
+        # do we keep running sums
+        self.has_sum = sum
         if sum:
             if stats:
-                self.day_sum = stats.sum
-                self.day_xsum = stats.xsum
-                self.day_ysum = stats.ysum
+                self.day_sum, self.day_xsum, self.day_ysum = stats.sum, stats.xsum, stats.ysum
             else:
-                self.day_sum = 0.0
-                self.day_xsum = 0.0
-                self.day_ysum = 0.0
+                self.day_sum, self.day_xsum, self.day_ysum = 0.0, 0.0, 0.0
             self.nineam_sum = 0.0
             self.interval_sum = 0.0
 
@@ -2164,6 +2327,12 @@ class VectorBuffer(object):
 
         (w_speed, w_dir) = val
         if w_speed is not None:
+            if w_dir is not None and (history or sum):
+                # the speed weighted x and y components are used by both our
+                # history and our sums so calculate them once
+                w_rad = math.radians(90.0 - w_dir)
+                w_x = w_speed * math.cos(w_rad)
+                w_y = w_speed * math.sin(w_rad)
             if self.lasttime is None or ts >= self.lasttime:
                 self.last = (w_speed, w_dir)
                 self.lasttime = ts
@@ -2176,25 +2345,39 @@ class VectorBuffer(object):
                     self.day_maxtime = ts
             if history:
                 if w_dir is not None:
-                    self.history.append(ObsTuple((w_speed,
-                                                  math.cos(math.radians(90.0 - w_dir)),
-                                                  math.sin(math.radians(90.0 - w_dir))), ts))
+                    # save the speed and the speed weighted x and y
+                    # components, vector averages then only need to sum the
+                    # components
+                    obs = ObsTuple((w_speed, w_x, w_y), ts)
+                    self.history.append(obs)
+                    self.history_sum += w_speed
+                    self.history_xsum += w_x
+                    self.history_ysum += w_y
+                    if w_speed:
+                        self.history_nonzero += 1
+                    # any max history samples with a lower speed can no
+                    # longer be a history max
+                    max_history = self.max_history
+                    while max_history and max_history[-1].value[0] < w_speed:
+                        max_history.pop()
+                    max_history.append(obs)
                 self.trim_history(ts)
             if sum:
                 self.day_sum += w_speed
                 if w_dir is not None:
-                    self.day_xsum = w_speed * math.cos(math.radians(90.0 - w_dir))
-                    self.day_ysum = w_speed * math.sin(math.radians(90.0 - w_dir))
+                    self.day_xsum += w_x
+                    self.day_ysum += w_y
 
     def day_reset(self):
         """Reset the vector obs buffer."""
 
         (self.day_min, self.day_mintime,
          self.day_max, self.day_maxtime) = VectorBuffer.default_init
-        try:
+        # Only day_sum is reset. The day vector components are not accumulated
+        # from loop packets (wind is added without sums) so zeroing them would
+        # lose the values we were seeded with.
+        if self.has_sum:
             self.day_sum = 0.0
-        except AttributeError:
-            pass
 
     def nineam_reset(self):
         """Reset the vector obs buffer."""
@@ -2207,15 +2390,68 @@ class VectorBuffer(object):
         self.interval_sum = 0.0
 
     def trim_history(self, ts):
-        """Trim an old data from the history list."""
+        """Trim any old data from the history.
 
-        if len(self.history) > 0:
-            # calc ts of the oldest sample we want to retain
-            oldest_ts = ts - MAX_AGE
-            # set history_full
-            self.history_full = min([a.ts for a in self.history if a.ts is not None]) <= oldest_ts
-            # remove any values older than oldest_ts
-            self.history = [s for s in self.history if s.ts > oldest_ts]
+        The history is in timestamp order so old data is removed from the
+        left. If any data was removed the history covers the full MAX_AGE
+        period.
+        """
+
+        # calc ts of the oldest sample we want to retain
+        oldest_ts = ts - MAX_AGE
+        history = self.history
+        removed = 0
+        # remove any values older than oldest_ts
+        while history and history[0].ts <= oldest_ts:
+            (w_speed, w_x, w_y) = history.popleft().value
+            self.history_sum -= w_speed
+            self.history_xsum -= w_x
+            self.history_ysum -= w_y
+            if w_speed:
+                self.history_nonzero -= 1
+            removed += 1
+        self.history_full = removed > 0
+        if removed > 0:
+            self.history_removed += removed
+            if self.history_nonzero == 0:
+                # my history is empty or calm so my running sums are zero,
+                # discard any rounding error
+                self.history_sum = 0.0
+                self.history_xsum = 0.0
+                self.history_ysum = 0.0
+                self.history_removed = 0
+            elif self.history_removed >= len(history):
+                # my history has turned over since my running sums were last
+                # recalculated, recalculate them so rounding errors do not
+                # accumulate
+                self.history_sum = math.fsum([a.value[0] for a in history])
+                self.history_xsum = math.fsum([a.value[1] for a in history])
+                self.history_ysum = math.fsum([a.value[2] for a in history])
+                self.history_removed = 0
+        max_history = self.max_history
+        while max_history and max_history[0].ts <= oldest_ts:
+            max_history.popleft()
+
+    def period_history(self, born):
+        """Return the history samples that are no older than a given time.
+
+        My history is in timestamp order so it is searched from the newest
+        sample and the search stops at the first sample that is too old.
+
+        Inputs:
+            born: the timestamp of the oldest sample to be returned
+
+        Returns:
+            A list of ObsTuples in timestamp order.
+        """
+
+        samples = []
+        for a in reversed(self.history):
+            if a.ts < born:
+                break
+            samples.append(a)
+        samples.reverse()
+        return samples
 
     def history_max(self, ts, age=MAX_AGE):
         """Return the max value in my history.
@@ -2229,17 +2465,16 @@ class VectorBuffer(object):
 
         Returns:
             An object of type ObsTuple where value is a 3 way tuple of
-            (value, x component, y component) and ts is the timestamp when
-            it occurred.
+            (value, speed weighted x component, speed weighted y component)
+            and ts is the timestamp when it occurred.
         """
 
         born = ts - age
-        snapshot = [a for a in self.history if a.ts >= born]
-        if len(snapshot) > 0:
-            _max = max(snapshot, key=itemgetter(1)[0])
-            return ObsTuple(_max[0], _max[1])
-        else:
-            return ObsTuple(None, None)
+        # the first max history sample in the period is the max
+        for a in self.max_history:
+            if a.ts >= born:
+                return a
+        return ObsTuple(None, None)
 
     def history_avg(self, ts, age=MAX_AGE):
         """Return the average value in my history.
@@ -2256,7 +2491,10 @@ class VectorBuffer(object):
         """
 
         born = ts - age
-        snapshot = [a.value[0] for a in self.history if a.ts >= born]
+        if len(self.history) > 0 and self.history[0].ts >= born:
+            # all of my history is in the period, use my running sum
+            return self.history_sum / len(self.history)
+        snapshot = [a.value[0] for a in self.period_history(born)]
         if len(snapshot) > 0:
             return sum(snapshot)/len(snapshot)
         else:
@@ -2278,17 +2516,20 @@ class VectorBuffer(object):
         """
 
         born = ts - age
-        rec = [a.value for a in self.history if a.ts >= born]
+        if len(self.history) > 0 and self.history[0].ts >= born:
+            # all of my history is in the period, use my running sums
+            rec = self.history
+            x = self.history_xsum
+            y = self.history_ysum
+        else:
+            rec = [a.value for a in self.period_history(born)]
+            # our history holds speed weighted x and y components so we only
+            # need to sum them
+            x = sum([sample[1] for sample in rec])
+            y = sum([sample[2] for sample in rec])
         if len(rec) > 0:
-            x = 0
-            y = 0
-            for sample in rec:
-                x += sample[0] * sample[1] if sample[1] is not None else 0.0
-                y += sample[0] * sample[2] if sample[2] is not None else 0.0
-            _dir = 90.0 - math.degrees(math.atan2(y, x))
-            if _dir < 0.0:
-                _dir += 360.0
-            _value = math.sqrt(pow(x, 2) + pow(y, 2))
+            _dir = (90.0 - math.degrees(math.atan2(y, x))) % 360.0
+            _value = math.hypot(x, y)
             return _value, _dir
         else:
             return None, None
@@ -2297,10 +2538,7 @@ class VectorBuffer(object):
     def vec_dir(self):
         """The day vector average direction."""
 
-        _result = 90.0 - math.degrees(math.atan2(self.day_ysum, self.day_xsum))
-        if _result < 0.0:
-            _result += 360.0
-        return _result
+        return (90.0 - math.degrees(math.atan2(self.day_ysum, self.day_xsum))) % 360.0
 
 
 # ============================================================================
@@ -2310,22 +2548,37 @@ class VectorBuffer(object):
 class ScalarBuffer(object):
     """Class to buffer scalar obs."""
 
+    # as for VectorBuffer use slots rather than a per instance dict
+    __slots__ = ('last', 'lasttime', 'day_min', 'day_mintime', 'day_max',
+                 'day_maxtime', 'history', 'history_full', 'max_history',
+                 'history_sum', 'history_nonzero', 'history_removed',
+                 'has_sum', 'day_sum', 'nineam_sum', 'interval_sum')
+
     default_init = (None, None, None, None)
 
     def __init__(self, stats, history=False, sum=False):
         self.last = None
         self.lasttime = None
-        if stats:
-            self.day_min = stats.min
-            self.day_mintime = stats.mintime
-            self.day_max = stats.max
-            self.day_maxtime = stats.maxtime
-        else:
-            (self.day_min, self.day_mintime,
-             self.day_max, self.day_maxtime) = ScalarBuffer.default_init
+        (self.day_min, self.day_mintime,
+         self.day_max, self.day_maxtime) = unpack_hilo_stats(stats,
+                                                             ScalarBuffer.default_init)
         if history:
-            self.history = []
+            self.history = deque()
             self.history_full = False
+            # The history samples that could be the max value of a history
+            # period ending now. Each sample is no less than every later
+            # sample, so the first sample in a period is the max value for
+            # that period.
+            self.max_history = deque()
+            # running sum of the values in my history
+            self.history_sum = 0.0
+            # the number of non-zero values in my history and the number of
+            # values removed since my running sum was last recalculated, as
+            # for VectorBuffer
+            self.history_nonzero = 0
+            self.history_removed = 0
+        # do we keep running sums
+        self.has_sum = sum
         if sum:
             if stats:
                 self.day_sum = stats.sum
@@ -2349,7 +2602,17 @@ class ScalarBuffer(object):
                     self.day_max = val
                     self.day_maxtime = ts
             if history:
-                self.history.append(ObsTuple(val, ts))
+                obs = ObsTuple(val, ts)
+                self.history.append(obs)
+                self.history_sum += val
+                if val:
+                    self.history_nonzero += 1
+                # any max history samples with a lower value can no longer be
+                # a history max
+                max_history = self.max_history
+                while max_history and max_history[-1].value < val:
+                    max_history.pop()
+                max_history.append(obs)
                 self.trim_history(ts)
             if sum:
                 self.day_sum += val
@@ -2361,10 +2624,8 @@ class ScalarBuffer(object):
 
         (self.day_min, self.day_mintime,
          self.day_max, self.day_maxtime) = ScalarBuffer.default_init
-        try:
+        if self.has_sum:
             self.day_sum = 0.0
-        except AttributeError:
-            pass
 
     def nineam_reset(self):
         """Reset the scalar obs buffer."""
@@ -2377,14 +2638,62 @@ class ScalarBuffer(object):
         self.interval_sum = 0.0
 
     def trim_history(self, ts):
-        """Trim an old data from the history list."""
+        """Trim any old data from the history.
+
+        The history is in timestamp order so old data is removed from the
+        left. If any data was removed the history covers the full MAX_AGE
+        period.
+        """
 
         # calc ts of the oldest sample we want to retain
         oldest_ts = ts - MAX_AGE
-        # set history_full
-        self.history_full = min([a.ts for a in self.history if a.ts is not None]) <= oldest_ts
+        history = self.history
+        removed = 0
         # remove any values older than oldest_ts
-        self.history = [s for s in self.history if s.ts > oldest_ts]
+        while history and history[0].ts <= oldest_ts:
+            value = history.popleft().value
+            self.history_sum -= value
+            if value:
+                self.history_nonzero -= 1
+            removed += 1
+        self.history_full = removed > 0
+        if removed > 0:
+            self.history_removed += removed
+            if self.history_nonzero == 0:
+                # my history is empty or all zero so my running sum is zero,
+                # discard any rounding error
+                self.history_sum = 0.0
+                self.history_removed = 0
+            elif self.history_removed >= len(history):
+                # my history has turned over since my running sum was last
+                # recalculated, recalculate it so rounding errors do not
+                # accumulate
+                self.history_sum = math.fsum([a.value for a in history])
+                self.history_removed = 0
+        max_history = self.max_history
+        while max_history and max_history[0].ts <= oldest_ts:
+            max_history.popleft()
+
+    def period_history(self, born):
+        """Return the history samples that are no older than a given time.
+
+        My history is in timestamp order so it is searched from the newest
+        sample and the search stops at the first sample that is too old.
+
+        Inputs:
+            born: the timestamp of the oldest sample to be returned
+
+        Returns:
+            A list of ObsTuples in timestamp order.
+        """
+
+        samples = []
+        for a in reversed(self.history):
+            if a.ts < born:
+                break
+            samples.append(a)
+        samples.reverse()
+        return samples
 
     def history_max(self, ts, age=MAX_AGE):
         """Return the max value in my history.
@@ -2402,19 +2711,21 @@ class ScalarBuffer(object):
         """
 
         born = ts - age
-        snapshot = [a for a in self.history if a.ts >= born]
-        if len(snapshot) > 0:
-            _max = max(snapshot, key=itemgetter(1))
-            return ObsTuple(_max[0], _max[1])
-        else:
-            return ObsTuple(None, None)
+        # the first max history sample in the period is the max
+        for a in self.max_history:
+            if a.ts >= born:
+                return a
+        return ObsTuple(None, None)
 
     def history_avg(self, ts, age=MAX_AGE):
         """Return my average."""
 
         if len(self.history) > 0:
             born = ts - age
-            rec = [a.value for a in self.history if a.ts >= born]
+            if self.history[0].ts >= born:
+                # all of my history is in the period, use my running sum
+                return self.history_sum / len(self.history)
+            rec = [a.value for a in self.period_history(born)]
             if len(rec) > 0:
                 return float(sum(rec))/len(rec)
             else:
@@ -2482,11 +2793,19 @@ class RtcrBuffer(dict):
 
         # the packet is already in our unit system so as long as we have a
         # timestamp add the fields of interest
-        if packet['dateTime'] is not None:
-            for obs in [f for f in packet if f in MANIFEST]:
-                add_func = add_functions.get(obs, RtcrBuffer.add_value)
-                add_func(self, packet, obs, obs in HILO_MANIFEST,
-                         obs in HIST_MANIFEST, obs in SUM_MANIFEST)
+        ts = packet['dateTime']
+        if ts is not None:
+            for obs in MANIFEST.intersection(packet):
+                add_func, hilo, hist, sum = add_dispatch[obs]
+                obs_buffer = self.get(obs)
+                if add_func is None and obs_buffer is not None:
+                    # the usual case, an obs without a special add function
+                    # that we have seen before, add it directly to its buffer
+                    obs_buffer._add_value(packet[obs], ts, hilo, hist, sum)
+                else:
+                    if add_func is None:
+                        add_func = RtcrBuffer.add_value
+                    add_func(self, packet, obs, hilo, hist, sum)
 
     def add_value(self, packet, obs_type, hilo, hist, sum):
         """Add a value to the buffer."""
@@ -2515,11 +2834,9 @@ class RtcrBuffer(dict):
         """Clean out any old obs from the buffer history."""
 
         for obs in HIST_MANIFEST:
-            self[obs]['history_full'] = min([a.ts for a in self[obs]['history'] if a.ts is not None])
-            # calc ts of oldest sample we want to retain
-            oldest_ts = ts - MAX_AGE
-            # remove any values older than oldest_ts
-            self[obs]['history'] = [s for s in self[obs]['history'] if s.ts > oldest_ts]
+            if obs in self:
+                # the buffer object trims its own history
+                self[obs].trim_history(ts)
 
     def start_of_day_reset(self):
         """Reset our buffer stats at the end of an archive period.
@@ -2547,16 +2864,25 @@ class RtcrBuffer(dict):
 #                            Configuration dictionaries
 # ============================================================================
 
-init_dict = ListOfDicts({'wind': VectorBuffer})
-add_functions = ListOfDicts({'windSpeed': RtcrBuffer.add_wind_value})
-seed_functions = ListOfDicts({'wind': RtcrBuffer.seed_vector})
+# each of these is only ever a single dict so a plain dict is used rather than
+# a ListOfDicts, lookups are then a single dict lookup
+init_dict = {'wind': VectorBuffer}
+add_functions = {'windSpeed': RtcrBuffer.add_wind_value}
+seed_functions = {'wind': RtcrBuffer.seed_vector}
+# the add function (None if RtcrBuffer.add_value is used) and hilo, history and
+# sum flags used for each buffered obs, determined once rather than for each
+# loop packet
+add_dispatch = dict([(obs, (add_functions.get(obs),
+                            obs in HILO_MANIFEST,
+                            obs in HIST_MANIFEST,
+                            obs in SUM_MANIFEST)) for obs in MANIFEST])
 
 
 # ============================================================================
 #                              class ObsTuple
 # ============================================================================
 
-class ObsTuple(tuple):
+class ObsTuple(namedtuple('ObsTuple', 'value ts')):
     """Class to represent and observation in time.
 
     An observation can be uniquely represented by the value of the observation
@@ -2575,16 +2901,8 @@ class ObsTuple(tuple):
     about the time the observation was observed).
     """
 
-    def __new__(cls, *args):
-        return tuple.__new__(cls, args)
-
-    @property
-    def value(self):
-        return self[0]
-
-    @property
-    def ts(self):
-        return self[1]
+    # an obs tuple has no attributes other than value and ts
+    __slots__ = ()
 
 
 # ============================================================================
@@ -2614,6 +2932,8 @@ class CachedPacket(object):
            "barometer", "radiation", "rain", "rainRate", "windSpeed",
            "appTemp", "dewpoint", "heatindex", "humidex", "inTemp",
            "outTemp", "windchill", "UV"]
+    # loop packet fields that are not cached
+    NOT_CACHED = frozenset(["dateTime", "usUnits"])
 
     def __init__(self, rec):
         """Initialise our cache object.
@@ -2660,9 +2980,17 @@ class CachedPacket(object):
             self.unit_system = packet['usUnits']
         elif self.unit_system != packet['usUnits']:
             packet = weewx.units.to_std_system(packet, self.unit_system)
-        for obs in [x for x in packet if x not in ['dateTime', 'usUnits']]:
-            if packet[obs] is not None:
-                self.cache[obs] = {'value': packet[obs], 'ts': ts}
+        cache = self.cache
+        for obs, value in iteritems(packet):
+            if value is not None and obs not in CachedPacket.NOT_CACHED:
+                # update any existing cache entry in place rather than
+                # replacing it
+                entry = cache.get(obs)
+                if entry is None:
+                    cache[obs] = {'value': value, 'ts': ts}
+                else:
+                    entry['value'] = value
+                    entry['ts'] = ts
 
     def get_value(self, obs, ts, max_age):
         """Get an obs value from the cache.
@@ -2684,22 +3012,280 @@ class CachedPacket(object):
         if ts is None:
             ts = int(time.time() + 0.5)
         packet = {'dateTime': ts, 'usUnits': self.unit_system}
-        for obs in self.cache:
-            packet[obs] = self.get_value(obs, ts, max_age)
+        # this is equivalent to calling get_value() for each cached obs but
+        # avoids a method call and repeated cache lookups per obs
+        for obs, entry in iteritems(self.cache):
+            packet[obs] = entry['value'] if ts - entry['ts'] <= max_age else None
         return packet
 
 
+# ============================================================================
+#                             class ArchiveCache
+# ============================================================================
+
+class ArchiveCache(object):
+    """Class to cache recent archive records.
+
+    Trend calculations require the archive record closest to a time in the
+    recent past. Rather than query the database each time a trend is
+    calculated recent archive records are kept in memory in timestamp order.
+    Records older than max_age seconds before the most recent record are
+    discarded.
+    """
+
+    def __init__(self, max_age):
+        # the age in seconds of the oldest record to be kept
+        self.max_age = max_age
+        # our records and their timestamps, both in timestamp order
+        self.timestamps = []
+        self.records = []
+
+    def load(self, db_manager, ts):
+        """Load archive records from the database.
+
+        Inputs:
+            db_manager: manager to be used
+            ts:         timestamp of the latest record to be loaded
+        """
+
+        for record in db_manager.genBatchRecords(ts - self.max_age, ts):
+            self.add(record)
+
+    def add(self, record):
+        """Add an archive record to the cache.
+
+        Inputs:
+            record: the archive record to be added
+        """
+
+        ts = record['dateTime']
+        if len(self.timestamps) == 0 or ts > self.timestamps[-1]:
+            # the usual case, a record newer than any we hold
+            self.timestamps.append(ts)
+            self.records.append(record)
+        else:
+            # the record belongs earlier in the cache, replace any record with
+            # the same timestamp otherwise insert it in timestamp order
+            idx = bisect.bisect_left(self.timestamps, ts)
+            if self.timestamps[idx] == ts:
+                self.records[idx] = record
+            else:
+                self.timestamps.insert(idx, ts)
+                self.records.insert(idx, record)
+        # discard any records that are too old
+        idx = bisect.bisect_left(self.timestamps,
+                                 self.timestamps[-1] - self.max_age)
+        if idx > 0:
+            del self.timestamps[:idx]
+            del self.records[:idx]
+
+    def getRecord(self, timestamp, max_delta):
+        """Get the cached record closest to a given time.
+
+        Mirrors the behaviour of weewx.manager.Manager.getRecord() when
+        max_delta is specified.
+
+        Inputs:
+            timestamp: the time of the desired record
+            max_delta: the largest difference in time that is acceptable
+
+        Returns:
+            The closest record within max_delta seconds of timestamp or None
+            if there is no such record.
+        """
+
+        idx = bisect.bisect_left(self.timestamps, timestamp)
+        result = None
+        best_delta = None
+        # the closest record is either side of where timestamp would be
+        # inserted, prefer the earlier record if they are equally close
+        for i in (idx - 1, idx):
+            if 0 <= i < len(self.timestamps):
+                delta = abs(self.timestamps[i] - timestamp)
+                if delta <= max_delta and (best_delta is None or delta < best_delta):
+                    result = self.records[i]
+                    best_delta = delta
+        return result
+
+
 # ============================================================================
 #                            Utility Functions
 # ============================================================================
 
+def unpack_hilo_stats(stats, default):
+    """Obtain the hi/lo values and times from a day stats object.
+
+    Inputs:
+        stats:   a day stats object for an obs, may be None
+        default: the 4 way tuple to use if there are no stats
+
+    Returns:
+        A 4 way tuple of (min, mintime, max, maxtime).
+    """
+
+    if stats:
+        return stats.min, stats.mintime, stats.max, stats.maxtime
+    return default
+
+
+def packet_field(field, default):
+    """Obtain a function that extracts a mapped field from a packet.
+
+    Inputs:
+        field:   the packet field to be extracted, may be None or an empty
+                 string if there is no mapped field
+        default: the value to be returned if the field is not mapped, does not
+                 exist in the packet or is None
+
+    Returns:
+        A function that accepts a packet and returns the field value or the
+        default.
+    """
+
+    if not field:
+        # there is no mapped field so we always return the default
+        return lambda packet: default
+
+    def extract(packet):
+        value = packet.get(field)
+        return value if value is not None else default
+    return extract
+
+
+def render_field(value, fmt):
+    """Render a clientraw.txt field value as a string.
+
+    Inputs:
+        value: the value to be rendered, may be a number, a string or None
+        fmt:   format string to be used to format the value as a float, eg
+               '%.1f', may be None
+
+    Returns:
+        A string containing the formatted value. If value is None '0.0' is
+        returned. If fmt is None or the value cannot be formatted as a float
+        the value is returned as received but converted to a string.
+    """
+
+    # if our value is None then we don't want to return 'None' so return
+    # '0.0' instead
+    if value is None:
+        return '0.0'
+    if fmt is not None:
+        try:
+            return fmt % float(value)
+        except (TypeError, ValueError):
+            pass
+    # Convert our value to a string. Our value could be a unicode string so be
+    # prepared to catch the error.
+    try:
+        return str(value)
+    except UnicodeEncodeError:
+        return six.ensure_text(value)
+
+
+def time_formatter(fmt):
+    """Obtain a function that formats a struct_time using a strftime format.
+
+    time.strftime() is comparatively slow. The default date and time formats
+    contain only simple numeric directives, so for these formats a function
+    that formats the struct_time fields directly is returned.
+
+    Inputs:
+        fmt: a strftime format string, eg '%H:%M'
+
+    Returns:
+        A function that accepts a struct_time and returns the formatted
+        string.
+    """
+
+    if fmt == '%H:%M':
+        return lambda lt: '%02d:%02d' % (lt.tm_hour, lt.tm_min)
+    if fmt == '%H:%M:%S':
+        return lambda lt: '%02d:%02d:%02d' % (lt.tm_hour, lt.tm_min, lt.tm_sec)
+    if fmt == '%-d/%-m/%Y':
+        return lambda lt: '%d/%d/%d' % (lt.tm_mday, lt.tm_mon, lt.tm_year)
+    return lambda lt: time.strftime(fmt, lt)
+
+
+def replace_file(src, dst):
+    """Rename a file replacing any existing destination file.
+
+    os.replace() replaces an existing destination file on all platforms but is
+    not available under python 2. Under python 2 os.rename() is used, on
+    Windows os.rename() fails if the destination file exists so in that case
+    the destination file is removed and the rename tried again.
+
+    Inputs:
+        src: path and file name of the file to be renamed
+        dst: path and file name to rename the file to
+    """
+
+    _replace = getattr(os, 'replace', None)
+    if _replace is not None:
+        _replace(src, dst)
+    else:
+        try:
+            os.rename(src, dst)
+        except OSError:
+            if not os.path.exists(dst):
+                raise
+            os.remove(dst)
+            os.rename(src, dst)
+
+
+def max2(a, b):
+    """Return the larger of two values ignoring None values.
+
+    A two value equivalent of weeutil.weeutil.max_with_none() that avoids
+    building a list.
+
+    Inputs:
+        a: the first value, may be None
+        b: the second value, may be None
+
+    Returns:
+        The larger of a and b. If one value is None the other value is
+        returned, if both are None None is returned.
+    """
+
+    if b is None:
+        return a
+    if a is None:
+        return b
+    return a if a >= b else b
+
+
+def make_converter(from_unit, to_unit):
+    """Obtain a function that converts a value from one unit to another.
+
+    Inputs:
+        from_unit: the unit to be converted from, eg 'meter_per_second'
+        to_unit:   the unit to be converted to, eg 'knot'
+
+    Returns:
+        A function that accepts a value in from_unit and returns the value in
+        to_unit, None values are returned as None. If there is no known
+        conversion between the two units None is returned.
+    """
+
+    if from_unit == to_unit:
+        # no conversion is necessary
+        return lambda value: value
+    try:
+        conversion_fn = weewx.units.conversionDict[from_unit][to_unit]
+    except KeyError:
+        # we don't know how to do this conversion
+        return None
+    return lambda value: conversion_fn(value) if value is not None else None
+
+
 def calc_trend(obs_type, now_vt, db_manager, then_ts, grace):
     """ Calculate change in an observation over a specified period.
 
     Inputs:
         obs_type:   database field name of observation concerned
         now_vt:     value of observation now (ie the finishing value)
-        db_manager: manager to be used
+        db_manager: manager or ArchiveCache object to be used
         then_ts:    timestamp of start of trend period
         grace:      the largest difference in time when finding the then_ts
                     record that is acceptable
@@ -2721,3 +3307,19 @@ def calc_trend(obs_type, now_vt, db_manager, then_ts, grace):
             if then is not None:
                 result = now_vt.value - then
     return result
+
+
+def trend_sign(trend):
+    """Obtain the clientraw trend logic string for a trend value.
+
+    Inputs:
+        trend: change in value over the trend period, may be None
+
+    Returns:
+        '+1' if the trend is positive, '-1' if the trend is negative or '0' if
+        the trend is 0 or None.
+    """
+
+    if trend is None:
+        return '0'
+    return TREND_SIGNS[(trend > 0) - (trend < 0) + 1]
@@ -12,54 +12,37 @@ PARTICULAR PURPOSE.  See the GNU General Public License for more details.
 
 Version: 0.3.7                                        Date: 31 August 2023
 
-Revision History
-    31 August 2023      v0.3.7
-        - comment out rtcr_path config option so that default (HTML_ROOT) is
-          used for new installs
-        - tidied up rtcr_path comments
-    24 March 2023       v0.3.6
-        -   config for installer is now derived from a multiline string for
-            easy modification of config settings and to allow embedded comments
-            in installed config stanzas
-    22 January 2023     v0.3.5
-        - no change, bump version only
-    3 April 2022        v0.3.4
-        - no change, bump version only
-    7 February 2022     v0.3.3
-        - no change, bump version only
-    25 November 2021    v0.3.2
-        - no change, bump version only
-    13 May 2021         v0.3.0
-        - no change, bump version only
-    9 March 2020        v0.2.3
-        - no change, bump version only
-    1 March 2020        v0.2.2
-        - no change, bump version only
-    22 June 2019         v0.2.1
-        - fix some pycharm complaints
-        - reformat top of file comments
-    19 March 2017       v0.2.0
-        - no change, bump version only
-    7 March 2017        v0.1.0
-        - initial implementation
+Revision history is included in the changelog.
 """
 
 # python imports
 import configobj
-from distutils.version import StrictVersion
+import re
 from setup import ExtensionInstaller
 
-# import StringIO, use six.moves due to python2/python3 differences
-from six.moves import StringIO
-
 # WeeWX imports
 import weewx
 
 REQUIRED_VERSION = "4.5.0"
 RTCR_VERSION = "0.3.7"
 
-# Multi-line config string, makes it easier to include comments. Needs to be
-# explicitly set as unicode or python2 StringIO complains.
+
+def version_tuple(version):
+    """Convert a version string to a tuple of ints for comparison.
+
+    Only the leading digits of each of the first three components are used so
+    pre-release versions such as '5.0.0b3' are converted to (5, 0, 0). Missing
+    components are taken as 0 so '4.5' is converted to (4, 5, 0).
+    """
+
+    parts = (version.split('.') + ['0', '0'])[:3]
+    return tuple(int(re.match(r'\d*', part).group() or 0) for part in parts)
+
+
+# the minimum WeeWX version as a tuple, only need create it once
+REQUIRED_VERSION_TUPLE = version_tuple(REQUIRED_VERSION)
+
+# Multi-line config string, makes it easier to include comments.
 rtcr_config = u"""
 [RealtimeClientraw]
 
@@ -76,6 +59,11 @@ rtcr_config = u"""
     # commented out or blank.
     # remote_server_url = http://your.website.com/post_clientraw.php
 
+    # Whether to gzip compress data posted to remote_server_url. Only enable 
+    # if the web server or script receiving the post supports gzip 
+    # Content-Encoding. Optional, default is False.
+    # post_compression = False
+
     # min_interval sets the minimum clientraw.txt generation interval. 
     # 10 seconds is recommended for all Saratoga template users. Default 
     # is 0 seconds.
@@ -100,20 +88,44 @@ rtcr_config = u"""
     short_time_format = %H:%M
 """
 
-# obtain our config string as a configobj dict
-rtcr_dict = configobj.ConfigObj(StringIO(rtcr_config))
+# our config string as a configobj dict, parsed when first needed
+rtcr_dict = None
+
+
+def get_rtcr_dict():
+    """Obtain our config string as a configobj dict.
+
+    The config string is only parsed the first time it is needed, subsequent
+    calls return the already parsed configobj dict.
+    """
+
+    global rtcr_dict
+
+    if rtcr_dict is None:
+        # ConfigObj accepts a list of lines so there is no need to wrap our
+        # config string in a file-like object
+        rtcr_dict = configobj.ConfigObj(rtcr_config.splitlines())
+    return rtcr_dict
+
+
+# our installer object, created the first time the loader is called
+rtcr_installer = None
 
 
 def loader():
-    return RtcrInstaller()
+    global rtcr_installer
+
+    if rtcr_installer is None:
+        rtcr_installer = RtcrInstaller()
+    return rtcr_installer
 
 
 class RtcrInstaller(ExtensionInstaller):
     def __init__(self):
-        if StrictVersion(weewx.__version__) < StrictVersion(REQUIRED_VERSION):
-            msg = "%s requires WeeWX %s or greater, found %s" % ('Rtcr ' + RTCR_VERSION,
-                                                                 REQUIRED_VERSION,
-                                                                 weewx.__version__)
+        if version_tuple(weewx.__version__) < REQUIRED_VERSION_TUPLE:
+            msg = "Rtcr %s requires WeeWX %s or greater, found %s" % (RTCR_VERSION,
+                                                                      REQUIRED_VERSION,
+                                                                      weewx.__version__)
             raise weewx.UnsupportedFeature(msg)
         super(RtcrInstaller, self).__init__(
             version=RTCR_VERSION,
@@ -122,6 +134,6 @@ class RtcrInstaller(ExtensionInstaller):
             author="Gary Roderick",
             author_email="gjroderick@gmail.com",
             report_services=['user.rtcr.RealtimeClientraw'],
-            config=rtcr_dict,
+            config=get_rtcr_dict(),
             files=[('bin/user', ['bin/user/rtcr.py'])]
         )